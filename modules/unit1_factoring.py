@@ -1,24 +1,15 @@
 import streamlit as st
+import pandas as pd
 import os
 import re
 
+from utils.grammar import Grammar
+from utils.grammar_transforms import left_factor
+
 def tokenize_rule(text):
     """Robust tokenization: identifiers/keywords or single special characters."""
     return re.findall(r"[a-zA-Z0-9]+|[^a-zA-Z0-9\s]", text)
 
-def get_longest_common_prefix_tokens(token_lists):
-    if not token_lists or len(token_lists) < 2: return []
-    
-    first = token_lists[0]
-    prefix = []
-    for i in range(len(first)):
-        curr_sym = first[i]
-        for tokens in token_lists[1:]:
-            if i >= len(tokens) or tokens[i] != curr_sym:
-                return prefix
-        prefix.append(curr_sym)
-    return prefix
-
 def render_left_factoring():
     st.title("📑 4.3 Left Factoring")
     
@@ -86,67 +77,22 @@ def render_left_factoring():
         """)
 
     if st.button("🚀 Factor Grammar", use_container_width=True):
-        lines = [line.strip() for line in u_input.split("\n") if "->" in line]
-        if not lines:
+        grammar = Grammar.from_text(u_input, tokenizer=tokenize_rule)
+        if not grammar.productions:
             st.error("Invalid format. Use `LHS -> RHS | RHS`.")
         else:
-            final_grammar = []
-            for line in lines:
-                lhs, rhs_blob = line.split("->")
-                lhs = lhs.strip()
-                options = [opt.strip() for opt in rhs_blob.split("|") if opt.strip()]
-                
-                # Tokenize all options first
-                tokenized_options = [tokenize_rule(opt) for opt in options]
-                
-                # Group options by their first token
-                groups = {}
-                for i, tokens in enumerate(tokenized_options):
-                    first = tokens[0] if tokens else "ε"
-                    if first not in groups: groups[first] = []
-                    groups[first].append(tokens)
-                
-                with st.expander(f"🔍 Analyzing **{lhs}**", expanded=True):
-                    untouched_options = []
-                    new_rules = []
-                    
-                    for first_sym, group_token_lists in groups.items():
-                        if len(group_token_lists) > 1:
-                            # Find LCP tokens for this specific group
-                            lcp_tokens = get_longest_common_prefix_tokens(group_token_lists)
-                            alpha = " ".join(lcp_tokens)
-                            
-                            st.success(r"✅ Common Prefix Found for group starting with `" + first_sym + r"`: `" + alpha + r"`")
-                            
-                            betas = []
-                            for tokens in group_token_lists:
-                                rem = tokens[len(lcp_tokens):]
-                                border = " " if rem and len(rem) > 1 else ""
-                                betas.append(" ".join(rem) if rem else "ε")
-                            
-                            new_nt = f"{lhs}'"
-                            # Handle duplicate prime names if multiple groups exist
-                            active_groups = [g for g in groups.values() if len(g) > 1]
-                            if len(active_groups) > 1:
-                                new_nt = f"{lhs}_{first_sym}'"
-                                
-                            untouched_options.append(f"{alpha} {new_nt}")
-                            new_rules.append(f"{new_nt} -> " + " | ".join(betas))
-                        else:
-                            untouched_options.append(" ".join(group_token_lists[0]))
-
-                    # Create the main rule
-                    main_rule = f"{lhs} -> " + " | ".join(untouched_options)
-                    st.latex(main_rule.replace("->", r"\to"))
-                    for r in new_rules:
-                        st.latex(r.replace("->", r"\to"))
-                    
-                    final_grammar.append(main_rule)
-                    final_grammar.extend(new_rules)
+            result, report = left_factor(grammar)
+            if not report:
+                st.info("No common prefixes found. The grammar is already left-factored.")
+            else:
+                st.success(f"✅ Factored {len(report)} common prefix group(s); "
+                           f"{len(result.nonterminals) - len(grammar.nonterminals)} new non-terminal(s).")
+                with st.expander("🔍 Factoring Steps", expanded=True):
+                    st.dataframe(pd.DataFrame(report), use_container_width=True, hide_index=True)
 
             st.divider()
             st.markdown("### ✅ Resulting Grammar")
-            st.code("\n".join(final_grammar), language="text")
+            st.code(result.to_text(), language="text")
 
     # Navigation
     c1, c2 = st.columns(2)
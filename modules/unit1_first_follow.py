@@ -1,9 +1,22 @@
 import streamlit as st
+import pandas as pd
 import re
+from utils.grammar import Grammar
+from utils.grammar_transforms import normalize
 
 def tokenize(text):
     return re.findall(r"[a-zA-Z0-9]+'|[a-zA-Z0-9]+|[^a-zA-Z0-9\s]", text)
 
+def normalize_grammar_text(grammar_rules, epsilon=False, unit=False):
+    """Run the normalization pipeline on grammar text; returns `(normalized text, report)`."""
+    grammar, report = normalize(Grammar.from_text(grammar_rules, tokenizer=tokenize), epsilon, unit)
+    return grammar.to_text(), report
+
+def render_normalization_report(report):
+    if report:
+        with st.expander(f"🧹 Grammar normalized: {len(report)} production(s) removed or rewritten"):
+            st.dataframe(pd.DataFrame(report), use_container_width=True)
+
 def compute_first_follow(grammar_rules):
     # 1. Parse rules
     rules = {} # LHS -> List of RHS lists
@@ -193,14 +206,19 @@ def render_first_follow():
         - Use `|` for options.
         - Use `e` or `ε` for epsilon.
         - One non-terminal per line.
+        - Useless (non-productive or unreachable) symbols are removed first.
         """)
+        drop_epsilon = st.checkbox("Eliminate ε-productions first", key="ff_lab_epsilon")
+        drop_units = st.checkbox("Eliminate unit productions first", key="ff_lab_units")
 
     if st.button("🚀 Compute FIRST & FOLLOW", use_container_width=True):
         if not u_grammar.strip():
             st.error("Please enter a grammar.")
         else:
             try:
-                first_sets, follow_sets, nts = compute_first_follow(u_grammar)
+                normalized, report = normalize_grammar_text(u_grammar, drop_epsilon, drop_units)
+                render_normalization_report(report)
+                first_sets, follow_sets, nts = compute_first_follow(normalized)
                 
                 if not nts:
                     st.warning("No non-terminals found. Check your `->` symbols.")
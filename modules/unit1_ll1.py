@@ -1,9 +1,21 @@
 import streamlit as st
 import pandas as pd
 import re
+from utils.ll1_engine import compile_ll1_table, TRACE_FULL, DEFAULT_SAMPLE_EVERY
+from modules.unit1_first_follow import normalize_grammar_text, render_normalization_report
+
+TOKEN_RE = re.compile(r"[a-zA-Z0-9]+'|[a-zA-Z0-9]+|[^a-zA-Z0-9\s]")
 
 def tokenize(text):
-    return re.findall(r"[a-zA-Z0-9]+'|[a-zA-Z0-9]+|[^a-zA-Z0-9\s]", text)
+    return TOKEN_RE.findall(text)
+
+def iter_tokens(source):
+    """Streaming lexer: yields tokens from a string or any iterable of lines (e.g. an open file)."""
+    if isinstance(source, str):
+        source = (source,)
+    for chunk in source:
+        for m in TOKEN_RE.finditer(chunk):
+            yield m.group()
 
 def compute_first_follow_v2(grammar_rules):
     # 1. Parse rules
@@ -112,72 +124,28 @@ def get_first_of_string(string_tokens, first_sets, terminals):
     res.add("ε")
     return res
 
-def simulate_ll1_logic(firsts, follows, nts, terms, rules, input_str):
+def simulate_ll1_logic(firsts, follows, nts, terms, rules, input_str, trace=TRACE_FULL, sample_every=DEFAULT_SAMPLE_EVERY):
     try:
-        # Build Parsing Table for simulation
-        parsing_table = {nt: {} for nt in nts}
-        for lhs in nts:
-            for rhs in rules[lhs]:
-                alpha_first = get_first_of_string(rhs, firsts, terms)
-                for a in alpha_first:
-                    if a != "ε": parsing_table[lhs][a] = rhs
-                if "ε" in alpha_first:
-                    for b in follows[lhs]: parsing_table[lhs][b] = rhs
-        
-        start_nt = nts[0] if nts else None
-        if not start_nt: return None, "Error: No grammar found."
-        
-        input_tokens = tokenize(input_str) + ["$"]
-        stack = ["$", start_nt]
-        
-        history = []
-        steps = 0
-        limit = 100 
-        
-        while steps < limit:
-            curr_stack = " ".join(reversed(stack))
-            curr_input = " ".join(input_tokens)
-            top = stack[-1]
-            lookahead = input_tokens[0]
-            
-            step_data = {"Stack": curr_stack, "Input": curr_input}
-            
-            if top == "$" and lookahead == "$":
-                step_data["Action"] = "Accept ✅"
-                history.append(step_data)
-                break
-            
-            if top == lookahead:
-                step_data["Action"] = f"Match! Pop '{top}'"
-                history.append(step_data)
-                stack.pop()
-                input_tokens.pop(0)
-            elif top in parsing_table:
-                if lookahead in parsing_table[top]:
-                    rhs = parsing_table[top][lookahead]
-                    rhs_str = " ".join(rhs) if rhs else "ε"
-                    # Clean 'e' to ε for display
-                    rhs_display = ["ε" if x == 'e' or x == 'ε' else x for x in rhs] if rhs else ["ε"]
-                    step_data["Action"] = f"Predict: {top} → {' '.join(rhs_display)}"
-                    history.append(step_data)
-                    stack.pop()
-                    if rhs and rhs[0] not in ["ε", "e"]:
-                        for s in reversed(rhs):
-                            stack.append(s)
-                else:
-                    step_data["Action"] = f"Error: No rule for ({top}, {lookahead})"
-                    history.append(step_data)
-                    return history, f"Runtime Error: Input '{lookahead}' unexpected for '{top}'."
-            else:
-                step_data["Action"] = f"Error: Terminal mismatch."
-                history.append(step_data)
-                return history, f"Mismatch Error: Expected '{top}' but found '{lookahead}'."
-            
-            steps += 1
-        return history, None
+        # The dense table is compiled once per grammar and cached
+        table = compile_ll1_table(firsts, follows, nts, terms, rules)
+        return table.run(tokenize(input_str), trace=trace, sample_every=sample_every)
     except Exception as e:
         return None, str(e)
 
+def check_ll1_logic(firsts, follows, nts, terms, rules, input_str, trace=TRACE_FULL, sample_every=DEFAULT_SAMPLE_EVERY):
+    """Like `simulate_ll1_logic` but with panic-mode recovery: returns (history, errors) listing every syntax error."""
+    try:
+        table = compile_ll1_table(firsts, follows, nts, terms, rules)
+        return table.parse_with_recovery(tokenize(input_str), trace=trace, sample_every=sample_every)
+    except Exception as e:
+        return None, [{"Position": 0, "Token": "-", "Message": str(e), "Recovery": "-"}]
+
+def stream_ll1_events(firsts, follows, nts, terms, rules, tokens):
+    """Event-based counterpart of `simulate_ll1_logic`: lazily yields
+    (kind, symbol, detail) events for a token iterator instead of building a history list."""
+    table = compile_ll1_table(firsts, follows, nts, terms, rules)
+    return table.events(tokens)
+
 def render_ll1():
     st.title("🧩 4.5 LL(1) Predictive Parsing Table")
     
@@ -239,7 +207,9 @@ def render_ll1():
             st.error("Please enter a grammar.")
         else:
             try:
-                firsts, follows, nts, terms, rules = compute_first_follow_v2(u_grammar)
+                normalized, report = normalize_grammar_text(u_grammar)
+                render_normalization_report(report)
+                firsts, follows, nts, terms, rules = compute_first_follow_v2(normalized)
                 
                 def get_key(sym): return f" {sym} "
                 common_order = ["id", "+", "-", "*", "/", "(", ")", "num"]
@@ -1,7 +1,18 @@
 import streamlit as st
 import pandas as pd
-import re
-from collections import deque
+import math
+from utils.grammar import Grammar
+from utils.lr_engine import get_lr_table, BUILDERS
+from utils.glr import GLRParser, shift_reduce_trace
+from utils.cyk import CYKParser
+from utils.tokenizer import get_tokenizer
+from utils.grammar_transforms import normalize
+from modules.unit1_first_follow import render_normalization_report
+from utils.op_precedence import get_op_precedence_parser, check_operator_grammar
+
+OPERATOR_PRECEDENCE = "Operator Precedence"
+# CYK is O(n³) in the input length, so the cross-check is skipped on longer inputs
+CYK_MAX_TOKENS = 60
 
 def render_parsing_intro():
     st.title("🛡️ 4.1 Introduction to Parsers")
@@ -59,124 +70,146 @@ def render_parsing_intro():
 def render_user_sr_solver():
     st.header("🎮 Ultra-Scalable Shift-Reduce Solver")
     st.markdown(r"""
-    This solver uses **BFS (Breadth-First Search)** to explore all possible parsing paths. 
-    It will find the valid "Accept" sequence even if there are Shift-Reduce conflicts (like standard multiplication precedence).
+    This solver builds the **LR(0) item sets** and the **ACTION/GOTO tables** and then parses in **linear time**.
+    - **SLR(1):** reductions on FOLLOW sets.
+    - **LALR(1):** exact lookaheads via DeRemer–Pennello relations (accepts grammars like `S -> L = R | R` that SLR rejects).
+    - **LR(1):** full LR(1) power with Pager's on-the-fly merging of compatible states (about LALR-sized).
+    - **Canonical LR(1):** the textbook LR(1) collection, for comparing state counts.
+    - **Operator Precedence:** ⋖ ≐ ⋗ relations from LEADING/TRAILING sets, optionally compressed into precedence functions f/g, for operator grammars (no ε-rules, no adjacent non-terminals).
+    Shift-Reduce conflicts (like in ambiguous expression grammars) are resolved the yacc way: `%left '+'`, `%right '^'` and `%nonassoc '<'` lines declare precedence (later lines bind tighter) and associativity, and any conflict they do not cover goes to **shift** over reduce.
     """)
     
     c1, c2 = st.columns([2, 1])
     with c1:
-        u_rules = st.text_area("Grammar (e.g., E -> E+E | a):", value="E -> E+E\nE -> E*E\nE -> (E)\nE -> id", height=150, key="custom_sr_rules_ultra")
+        u_rules = st.text_area("Grammar (e.g., E -> E+E | a):", value="%left '+'\n%left '*'\nE -> E+E\nE -> E*E\nE -> (E)\nE -> id", height=180, key="custom_sr_rules_ultra")
         u_str = st.text_input("Input String (e.g., id + id * id):", value="id + id * id", key="custom_sr_str_ultra")
+        method = st.radio("Table Construction:", list(BUILDERS) + [OPERATOR_PRECEDENCE], horizontal=True, key="custom_sr_method")
+        use_functions = method == OPERATOR_PRECEDENCE and st.checkbox("Parse with precedence functions f/g instead of the relation table", key="custom_sr_use_fg")
+        cross_check = st.checkbox(f"Cross-check with CYK (O(n³), up to {CYK_MAX_TOKENS} tokens)", value=True, key="custom_sr_cyk")
     with c2:
         st.info("""
         **🚀 Ultra Scalable Mode:**
-        1. **Conflict Resolution:** Finds the path to the Start Symbol by exploring all shifts and reductions.
+        1. **Table-Driven:** SLR(1), LALR(1) or LR(1) tables, built once per grammar.
         2. **Intelligent Lexer:** Automatically detects tokens even without spaces.
-        3. **Robustness:** Handles complex grammars that simple greedy solvers fail on.
+        3. **Robustness:** If conflict resolution rejects the string, a GLR parser follows every conflicting action at once.
         """)
 
-    if st.button("🚀 Solve with BFS (Ultra Scalable)", use_container_width=True):
+    if st.button(f"🚀 Parse with {method} (Ultra Scalable)", use_container_width=True):
         try:
             # --- 1. Robust Grammar Extraction ---
-            grammar_rules = [] # List of (LHS, [RHS_tokens])
-            non_terminals = set()
-            all_symbols = set()
-            
-            for line in u_rules.split("\n"):
-                if "->" in line:
-                    lhs, rhs_blob = line.split("->")
-                    lhs = lhs.strip()
-                    non_terminals.add(lhs)
-                    all_symbols.add(lhs)
-                    
-                    # Split RHS by '|'
-                    options = rhs_blob.split("|")
-                    for opt in options:
-                        # Use regex to find alphanumeric words or single special chars
-                        rhs_tokens = re.findall(r"[a-zA-Z0-9]+|[^a-zA-Z0-9\s]", opt)
-                        grammar_rules.append((lhs, rhs_tokens))
-                        for t in rhs_tokens: all_symbols.add(t)
-
-            start_symbol = grammar_rules[0][0] if grammar_rules else None
+            grammar = Grammar.from_text(u_rules)
+            if not grammar.productions:
+                st.error("Please enter a grammar using `->` rules.")
+                return
+            grammar, report = normalize(grammar)
+            render_normalization_report(report)
+            if not grammar.productions:
+                st.error(f"The start symbol {grammar.start} derives no terminal string, so the language is empty.")
+                return
             
             # --- 2. Advanced Tokenizer ---
-            # Sort symbols by length to match longest tokens first (e.g., 'id' before 'i')
-            sorted_symbols = sorted(list(all_symbols), key=len, reverse=True)
-            # Add general alphanumeric pattern to match "id" even if it's not explicitly a terminal symbol in some contexts
-            token_pattern = "|".join([re.escape(s) for s in sorted_symbols if s.strip()] + [r"[a-zA-Z0-9]+"])
-            
-            def tokenize(text):
-                # Only use regex if there are no spaces (otherwise trust user spaces)
-                if " " in text.strip():
-                    return text.strip().split()
-                return re.findall(token_pattern, text.replace(" ", ""))
+            # A trie over the grammar's symbols splits the input by longest match
+            # (e.g., 'id' before 'i'); spaces only separate tokens
+            input_tokens = get_tokenizer(grammar).tokenize(u_str)
 
-            input_tokens = tokenize(u_str)
-            
-            # --- 3. BFS Solver ---
-            # State: (tuple(stack), tuple(input_buffer), list(history))
-            initial_state = (("$",), tuple(input_tokens + ["$"]), [])
-            queue = deque([initial_state])
-            visited = set()
-            
-            final_history = None
-            max_iterations = 2000
-            iterations = 0
+            if method == OPERATOR_PRECEDENCE:
+                render_operator_precedence(grammar, input_tokens, use_functions)
+                return
             
-            while queue and iterations < max_iterations:
-                curr_stack, curr_input, curr_history = queue.popleft()
-                iterations += 1
-                
-                state_key = (curr_stack, curr_input)
-                if state_key in visited: continue
-                visited.add(state_key)
-                
-                # Check for Accept
-                if curr_stack == ("$", start_symbol) and curr_input == ("$",):
-                    final_history = curr_history + [{"Stack": " ".join(curr_stack), "Input": " ".join(curr_input), "Action": "Accept"}]
-                    break
-                
-                # Possible Action: SHIFT
-                if len(curr_input) > 1: # Last token is always '$'
-                    next_token = curr_input[0]
-                    new_stack = curr_stack + (next_token,)
-                    new_input = curr_input[1:]
-                    new_hist = curr_history + [{"Stack": " ".join(curr_stack), "Input": " ".join(curr_input), "Action": f"Shift {next_token}"}]
-                    queue.append((new_stack, new_input, new_hist))
-                
-                # Possible Actions: REDUCE
-                for lhs, rhs in grammar_rules:
-                    if not rhs or rhs == [""]: continue # No epsilons for now
-                    n = len(rhs)
-                    if len(curr_stack) >= n:
-                        if list(curr_stack[-n:]) == rhs:
-                            new_stack = curr_stack[:-n] + (lhs,)
-                            rhs_str = ' '.join(rhs)
-                            action_str = f"Reduce: Handle = {rhs_str} --> {lhs}"
-                            new_hist = curr_history + [{"Stack": " ".join(curr_stack), "Input": " ".join(curr_input), "Action": action_str}]
-                            queue.append((new_stack, curr_input, new_hist))
+            # --- 3. Table-Driven Parse ---
+            table = get_lr_table(grammar, method)
+            final_history, error = table.parse(input_tokens)
+            glr_forest = None
+            if error and table.conflicts:
+                # Resolved conflicts may reject a valid string; fork on every conflict instead
+                forest = GLRParser(table).parse(input_tokens)
+                if forest.accepted:
+                    glr_forest = forest
+                    final_history, error = shift_reduce_trace(next(forest.trees()), input_tokens), None
 
             # --- 4. Display Results ---
             st.subheader("📊 Shift-Reduce Parsing Table")
             if input_tokens:
                 st.info(f"🔍 **Detected Tokens:** `{'`, `'.join(input_tokens)}`")
+            if cross_check and len(input_tokens) > CYK_MAX_TOKENS:
+                st.caption(f"🧮 CYK cross-check skipped: {len(input_tokens)} tokens is above the {CYK_MAX_TOKENS}-token limit for the O(n³) recognizer.")
+            elif cross_check:
+                cyk = CYKParser(grammar)
+                verdict = "✅ in the language" if cyk.recognize(input_tokens) else "❌ not in the language"
+                st.caption(f"🧮 CYK cross-check over the CNF grammar ({len(cyk.cnf.productions)} rules): {verdict}")
+                with st.expander("🧮 Chomsky Normal Form used by CYK"):
+                    st.code(cyk.cnf.to_text(), language="text")
+            if table.conflicts:
+                st.warning(f"⚠️ **{len(table.conflicts)} conflict(s)** in the {table.method} table (grammar is not {table.method}).")
+                st.dataframe(pd.DataFrame(table.conflicts), use_container_width=True)
+            if table.resolved:
+                with st.expander(f"⚖️ {len(table.resolved)} shift/reduce conflict(s) settled by precedence declarations"):
+                    st.dataframe(pd.DataFrame(table.resolved), use_container_width=True)
+
+            with st.expander(f"🧮 {table.method} ACTION / GOTO Table ({table.n_states} states)"):
+                st.dataframe(pd.DataFrame(table.table_rows()).set_index("State"), use_container_width=True)
+                for s in range(table.n_states):
+                    st.text(f"I{s}:\n{table.automaton.state_str(s)}")
             
-            if final_history:
+            if not error:
+                if glr_forest is not None:
+                    n_trees = glr_forest.count_trees()
+                    n_trees = "infinitely many" if n_trees == math.inf else f"{n_trees:,}"
+                    st.caption(f"ℹ️ Trace found by the GLR parser (graph-structured stack); the input has {n_trees} parse tree(s), the first is shown.")
                 st.table(pd.DataFrame(final_history))
                 st.success("✅ **Accept!** The string is valid according to the grammar.")
                 st.balloons()
             else:
-                st.error("❌ **Parsing Failed.** No valid sequence of shift/reduce reached the start symbol.")
+                if final_history:
+                    st.table(pd.DataFrame(final_history))
+                st.error(f"❌ **Parsing Failed.** {error}")
                 st.info("""
                 **Possible Reasons:**
                 1. The string is truly invalid for this grammar.
                 2. The start symbol was never reached.
-                3. The search space exceeded the limit (2000 states).
+                3. The tokens do not match the grammar's terminals.
                 """)
 
         except Exception as e:
             st.error(f"Solver Error: {e}")
 
+def render_operator_precedence(grammar, input_tokens, use_functions=False):
+    reason = check_operator_grammar(grammar)
+    if reason:
+        st.error(f"❌ Not an operator grammar: {reason}")
+        return
+    parser = get_op_precedence_parser(grammar)
+
+    st.subheader("📊 Operator-Precedence Parsing")
+    if input_tokens:
+        st.info(f"🔍 **Detected Tokens:** `{'`, `'.join(input_tokens)}`")
+    with st.expander("📋 LEADING / TRAILING Sets"):
+        st.table(pd.DataFrame([
+            {"Non-Terminal": nt,
+             "LEADING": ", ".join(sorted(parser.leading[nt])),
+             "TRAILING": ", ".join(sorted(parser.trailing[nt]))}
+            for nt in grammar.nonterminals
+        ]))
+    if parser.conflicts:
+        st.warning(f"⚠️ **{len(parser.conflicts)} precedence conflict(s)** (grammar is ambiguous); resolved by the `%left`/`%right`/`%nonassoc` declarations, undeclared operators counting as left-associative in order of appearance.")
+        st.dataframe(pd.DataFrame(parser.conflicts), use_container_width=True)
+    with st.expander("🧮 Precedence Relation Table", expanded=True):
+        st.dataframe(pd.DataFrame(parser.table_rows()).set_index(""), use_container_width=True)
+    if parser.f is None:
+        st.caption("ℹ️ The relation graph has a cycle, so no precedence functions f/g exist; the full table is used.")
+    else:
+        with st.expander("📐 Precedence Functions f / g"):
+            st.table(pd.DataFrame(parser.function_rows()).set_index("Terminal"))
+
+    final_history, error = parser.parse(input_tokens, use_functions=use_functions)
+    if final_history:
+        st.table(pd.DataFrame(final_history))
+    if not error:
+        st.success("✅ **Accept!** The string is valid according to the grammar.")
+        st.balloons()
+    else:
+        st.error(f"❌ **Parsing Failed.** {error}")
+
 def render_shift_reduce_simulator():
     st.header("🧪 Interactive Shift-Reduce Lab")
     st.markdown("""
@@ -1,5 +1,14 @@
+import time
+
+import pandas as pd
 import streamlit as st
 
+from utils.grammar import Grammar
+from utils.grammar_transforms import eliminate_left_recursion
+
+def rhs_size(grammar):
+    return sum(len(rhs) for _, rhs in grammar.productions)
+
 def render_left_recursion():
     st.title("🚫 4.1 Left Recursion (Elimination)")
     
@@ -87,50 +96,42 @@ F -> (E) | id
         """)
 
     if st.button("🚀 Eliminated Step-by-Step", use_container_width=True):
-        lines = [line.strip() for line in user_grammar.split("\n") if "->" in line]
-        if not lines:
+        grammar = Grammar.from_mixed_text(user_grammar)
+        if not grammar.productions:
             st.error("Invalid grammar format. Please use 'LHS -> RHS | RHS'.")
         else:
-            all_converted = []
-            for line in lines:
-                lhs, rhs_blob = line.split("->")
-                lhs = lhs.strip()
-                options = [opt.strip() for opt in rhs_blob.split("|") if opt.strip()]
-                
-                # Identify alpha and beta
-                alphas = []
-                betas = []
-                for opt in options:
-                    tokens = opt.split() if " " in opt else list(opt)
-                    if tokens and tokens[0] == lhs:
-                        # Left recursive
-                        alphas.append(" ".join(tokens[1:]))
-                    else:
-                        betas.append(opt)
-
-                with st.expander(f"🔍 Analyzing Non-Terminal: **{lhs}**", expanded=True):
-                    if alphas:
-                        st.write(f"✅ **Left Recursion Detected!**")
-                        st.markdown(r"- **$\alpha$ segments:** " + ", ".join([f"`{a}`" for a in alphas]))
-                        st.markdown(r"- **$\beta$ segments:** " + ", ".join([f"`{b}`" for b in betas]))
-                        
-                        new_nt = f"{lhs}'"
-                        rule1 = f"{lhs} -> " + " | ".join([f"{b} {new_nt}" for b in betas])
-                        rule2 = f"{new_nt} -> " + " | ".join([f"{a} {new_nt}" for a in alphas]) + " | ε"
-                        
-                        st.success("**Resulting Rules:**")
-                        st.latex(rule1.replace("->", r"\to"))
-                        st.latex(rule2.replace("->", r"\to"))
-                        all_converted.append(rule1)
-                        all_converted.append(rule2)
-                    else:
-                        st.write("❌ **No Direct Left Recursion.**")
-                        st.info("Rule remains unchanged.")
-                        all_converted.append(f"{lhs} -> {' | '.join(betas)}")
-
-            st.divider()
-            st.markdown("### ✅ Final Converted Grammar")
-            st.code("\n".join(all_converted), language="text")
+            try:
+                t0 = time.perf_counter()
+                result, report = eliminate_left_recursion(grammar)
+                elapsed = (time.perf_counter() - t0) * 1000
+            except ValueError as e:
+                st.error(f"❌ {e} Substitution copies every alternative of one non-terminal into the next, so densely mutually recursive grammars grow exponentially.")
+            else:
+                st.session_state.lr_lab_result = (user_grammar, result.to_text())
+                new_nts = [nt for nt in result.nonterminals if nt not in grammar.nonterminals]
+
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Rules", len(result.productions), len(result.productions) - len(grammar.productions), delta_color="off")
+                m2.metric("RHS Symbols", rhs_size(result), rhs_size(result) - rhs_size(grammar), delta_color="off")
+                m3.metric("New Non-Terminals", len(new_nts))
+                m4.metric("Time", f"{elapsed:.1f} ms")
+
+                if report:
+                    with st.expander("🔍 Elimination Steps", expanded=True):
+                        st.dataframe(pd.DataFrame(report), use_container_width=True, hide_index=True)
+                else:
+                    st.info("No left recursion found. The grammar is unchanged.")
+
+                st.divider()
+                st.markdown("### ✅ Final Converted Grammar")
+                st.code(result.to_text(), language="text")
+
+    sent = st.session_state.get("lr_lab_result")
+    if sent and sent[0] == user_grammar:
+        if st.button("📤 Send to LL(1) Table Generator", use_container_width=True):
+            st.session_state.ll1_sep_lab_input = sent[1]
+            st.session_state.unit1_topic = "4.5 LL(1) Predictive Parsing Table"
+            st.rerun()
 
     # Navigation
     c_nav1, c_nav2 = st.columns(2)
@@ -1,74 +1,25 @@
 import streamlit as st
 import pandas as pd
-import re
-
-# Need tokenizer and logic from ll1 or shared
-from modules.unit1_ll1 import compute_first_follow_v2, get_first_of_string, tokenize
-
-def simulate_ll1_logic(firsts, follows, nts, terms, rules, input_str):
-    try:
-        # Build Parsing Table for simulation
-        parsing_table = {nt: {} for nt in nts}
-        for lhs in nts:
-            for rhs in rules[lhs]:
-                alpha_first = get_first_of_string(rhs, firsts, terms)
-                for a in alpha_first:
-                    if a != "ε": parsing_table[lhs][a] = rhs
-                if "ε" in alpha_first:
-                    for b in follows[lhs]: parsing_table[lhs][b] = rhs
-        
-        start_nt = nts[0] if nts else None
-        if not start_nt: return None, "Error: No grammar found."
-        
-        input_tokens = tokenize(input_str) + ["$"]
-        stack = ["$", start_nt]
-        
-        history = []
-        steps = 0
-        limit = 100 
-        
-        while steps < limit:
-            curr_stack = " ".join(reversed(stack))
-            curr_input = " ".join(input_tokens)
-            top = stack[-1]
-            lookahead = input_tokens[0]
-            
-            step_data = {"Stack": curr_stack, "Input": curr_input}
-            
-            if top == "$" and lookahead == "$":
-                step_data["Action"] = "Accept ✅"
-                history.append(step_data)
-                break
-            
-            if top == lookahead:
-                step_data["Action"] = f"Match! Pop '{top}'"
-                history.append(step_data)
-                stack.pop()
-                input_tokens.pop(0)
-            elif top in parsing_table:
-                if lookahead in parsing_table[top]:
-                    rhs = parsing_table[top][lookahead]
-                    # Clean 'e' to ε for display
-                    rhs_display = ["ε" if x == 'e' or x == 'ε' else x for x in rhs] if rhs else ["ε"]
-                    step_data["Action"] = f"Predict: {top} → {' '.join(rhs_display)}"
-                    history.append(step_data)
-                    stack.pop()
-                    if rhs and rhs[0] not in ["ε", "e"]:
-                        for s in reversed(rhs):
-                            stack.append(s)
-                else:
-                    step_data["Action"] = f"Error: No rule for ({top}, {lookahead})"
-                    history.append(step_data)
-                    return history, f"Runtime Error: Input '{lookahead}' unexpected for '{top}'."
-            else:
-                step_data["Action"] = f"Error: Terminal mismatch."
-                history.append(step_data)
-                return history, f"Mismatch Error: Expected '{top}' but found '{lookahead}'."
-            
-            steps += 1
-        return history, None
-    except Exception as e:
-        return None, str(e)
+from itertools import islice
+
+# Tokenizer, FIRST/FOLLOW and the table-driven simulator are shared with the LL(1) page
+from modules.unit1_ll1 import compute_first_follow_v2, simulate_ll1_logic, check_ll1_logic, stream_ll1_events, iter_tokens, tokenize
+from modules.unit1_first_follow import normalize_grammar_text, render_normalization_report
+from utils.ll1_engine import compile_ll1_table, TRACE_FULL, TRACE_SAMPLED, TRACE_NONE
+from utils.rd_codegen import load_rd_parser
+from utils.parser_bench import benchmark_parsers
+from utils.grammar import Grammar
+from utils.earley import EarleyParser
+from utils.cyk import CYKParser
+
+TRACE_LEVELS = {
+    "Full step trace": TRACE_FULL,
+    "Sampled trace": TRACE_SAMPLED,
+    "No trace (throughput)": TRACE_NONE,
+}
+
+# The event view only pulls this many events from the streaming parser
+EVENT_PREVIEW = 200
 
 def render_stack_simulation():
     st.title("⚙️ 4.6 LL(1) Stack Implementation")
@@ -89,6 +40,13 @@ def render_stack_simulation():
                                  value="E -> T E'\nE' -> + T E' | e\nT -> F T'\nT' -> * F T' | e\nF -> ( E ) | id", 
                                  height=150, key="stack_sim_sep_grammar")
         u_input = st.text_input("Input String:", value="id + id * id", key="stack_sim_sep_input")
+        t1, t2 = st.columns([2, 1])
+        with t1:
+            trace_label = st.radio("Trace Level:", list(TRACE_LEVELS), horizontal=True, key="stack_sim_trace_level")
+        with t2:
+            sample_every = st.number_input("Sample every N steps:", min_value=1, value=50, step=1,
+                                           key="stack_sim_sample_every", disabled=TRACE_LEVELS[trace_label] != TRACE_SAMPLED)
+        recover = st.checkbox("🩹 Panic-mode error recovery (report every error in one pass)", key="stack_sim_recover")
         
     with col2:
         st.info("""
@@ -96,6 +54,7 @@ def render_stack_simulation():
         1. Grammar must be LL(1).
         2. Input tokens must match grammar terminals.
         3. The table is built automatically in the background.
+        4. With recovery on, errors are skipped using FOLLOW-based synchronizing sets.
         """)
 
     if st.button("▶️ Run Simulation", use_container_width=True):
@@ -103,8 +62,19 @@ def render_stack_simulation():
             st.error("Please provide both grammar and input string.")
         else:
             try:
-                firsts, follows, nts, terms, rules = compute_first_follow_v2(u_grammar)
-                history, error = simulate_ll1_logic(firsts, follows, nts, terms, rules, u_input)
+                normalized, report = normalize_grammar_text(u_grammar)
+                render_normalization_report(report)
+                firsts, follows, nts, terms, rules = compute_first_follow_v2(normalized)
+                if recover:
+                    history, errors = check_ll1_logic(firsts, follows, nts, terms, rules, u_input,
+                                                      trace=TRACE_LEVELS[trace_label], sample_every=int(sample_every))
+                    error = f"Found {len(errors)} syntax error(s); parsing resumed after each one." if errors else None
+                    if errors:
+                        st.subheader("🩹 Recovered Errors")
+                        st.dataframe(pd.DataFrame(errors), use_container_width=True)
+                else:
+                    history, error = simulate_ll1_logic(firsts, follows, nts, terms, rules, u_input,
+                                                        trace=TRACE_LEVELS[trace_label], sample_every=int(sample_every))
                 
                 if error:
                     st.error(error)
@@ -113,13 +83,60 @@ def render_stack_simulation():
                         st.dataframe(pd.DataFrame(history), use_container_width=True)
                 else:
                     st.success(f"✅ String '{u_input}' Accepted!")
-                    st.subheader("📋 Stack Execution Trace")
-                    st.dataframe(pd.DataFrame(history), use_container_width=True)
+                    if history:
+                        st.subheader("📋 Stack Execution Trace")
+                        st.dataframe(pd.DataFrame(history), use_container_width=True)
+
+                with st.expander(f"🧵 Parser Event Stream (first {EVENT_PREVIEW} events)"):
+                    events = stream_ll1_events(firsts, follows, nts, terms, rules, iter_tokens(u_input))
+                    st.dataframe(pd.DataFrame(list(islice(events, EVENT_PREVIEW)), columns=["Event", "Symbol", "Detail"]),
+                                 use_container_width=True)
             except Exception as e:
                 st.error(f"Logic Error: {str(e)}")
 
     st.divider()
 
+    # --- RECURSIVE DESCENT GENERATOR ---
+    st.header("⚡ Recursive-Descent Generator & Benchmark")
+    st.markdown("""
+    The same LL(1) table can be compiled into a **recursive-descent parser**: one Python function per non-terminal,
+    choosing its alternative from the lookahead. It avoids the explicit stack of the table-driven simulator.
+    Both engines are benchmarked on the same corpus (the input string above, repeated), next to the
+    general-CFG recognizers: **Earley** and **CYK** (over the Chomsky Normal Form of the grammar).
+    """)
+    copies = st.number_input("Corpus size (copies of the input):", min_value=1, value=1000, step=100, key="stack_rd_copies")
+
+    if st.button("🏗️ Generate & Benchmark", use_container_width=True):
+        if not u_grammar.strip() or not u_input.strip():
+            st.error("Please provide both grammar and input string.")
+        else:
+            try:
+                normalized, report = normalize_grammar_text(u_grammar)
+                render_normalization_report(report)
+                firsts, follows, nts, terms, rules = compute_first_follow_v2(normalized)
+                table = compile_ll1_table(firsts, follows, nts, terms, rules)
+                rd_parser = load_rd_parser(table)
+                if table.conflicts:
+                    st.warning("⚠️ Grammar is NOT LL(1); both parsers follow the last production in each conflicting cell.")
+
+                with st.expander("📄 Generated Parser Module"):
+                    st.code(rd_parser.__source__, language="python")
+
+                tokens = tokenize(u_input)
+                corpus = {f"{int(copies)} × input": [tokens] * int(copies)}
+                grammar = Grammar.from_text(normalized, tokenizer=tokenize)
+                rows = benchmark_parsers({
+                    "Table-driven LL(1)": table.recognize,
+                    "Generated recursive descent": rd_parser.recognize,
+                    "Earley": EarleyParser(grammar).recognize,
+                    "CYK (CNF)": CYKParser(grammar).recognize,
+                }, corpus)
+                st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            except Exception as e:
+                st.error(f"Generator Error: {str(e)}")
+
+    st.divider()
+
     # Navigation
     nav1, nav2 = st.columns(2)
     with nav1:
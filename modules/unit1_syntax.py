@@ -2,6 +2,60 @@ import streamlit as st
 import pandas as pd
 import random
 import re
+import math
+from itertools import islice
+
+from utils.grammar import Grammar, split_sentential
+from utils.earley import EarleyParser, tree_derivation
+from utils.derivation import DerivationEngine
+from utils.lr_engine import get_lr_table
+from utils.tokenizer import get_tokenizer
+from utils.reduction import ReductionSearch
+from utils.regular_grammar import classify_linear, grammar_to_nfa, nfa_accepts, to_lab_nfa
+
+# Derivation paths shown per page in the derivation and ambiguity labs
+DERIVATIONS_PER_PAGE = 3
+
+DERIVATION_STRATEGIES = {
+    "Forward BFS (all shortest paths)": "forward",
+    "Bidirectional (one shortest path)": "bidirectional",
+}
+
+def take_page(paths, page, per_page=DERIVATIONS_PER_PAGE):
+    """One page of a lazy path iterator, plus whether another page follows.
+
+    Only paths up to the end of the requested page (and one more) are generated.
+    """
+    items = list(islice(paths, page * per_page, (page + 1) * per_page + 1))
+    return items[:per_page], len(items) > per_page
+
+def render_pager(key, has_next):
+    page = st.session_state.get(key, 0)
+    if not page and not has_next:
+        return
+    prev_col, label_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("⬅️ Previous paths", key=f"{key}_prev", disabled=page == 0):
+            st.session_state[key] = page - 1
+            st.rerun()
+    with label_col:
+        st.caption(f"Page {page + 1}")
+    with next_col:
+        if st.button("Next paths ➡️", key=f"{key}_next", disabled=not has_next):
+            st.session_state[key] = page + 1
+            st.rerun()
+
+def lr_reduction_rows(history):
+    """Reduction-table rows from the trace of an accepted `LRTable.parse`."""
+    rows = []
+    for step in history:
+        form = " ".join(step["Stack"].split()[1:] + step["Input"].split()[:-1])
+        if step["Action"].startswith("Reduce"):
+            rhs, lhs = step["Action"].split("= ", 1)[1].split(" --> ")
+            rows.append({"Current String": form, "Reduction Applied": f"Replace `{rhs}` with `{lhs}`", "Rule Used": f"{lhs} → {rhs}"})
+        elif step["Action"] == "Accept":
+            rows.append({"Current String": form, "Reduction Applied": "**Start Symbol reached**", "Rule Used": "-"})
+    return rows
 
 def render_grammar_basics():
     st.subheader("3.1 Grammar Basics: The Mathematical Model")
@@ -85,6 +139,64 @@ def render_chomsky_hierarchy():
 
     st.success("✅ **Summary:** Type 3 is used for Tokens (Lexer), Type 2 is used for Structure (Parser)!")
 
+    st.divider()
+    st.subheader("🧪 Regular Grammar Detector")
+    st.markdown("Check whether a grammar is right- or left-linear (Type 3) and turn it into an NFA.")
+
+    rg_c1, rg_c2 = st.columns([2, 1])
+    with rg_c1:
+        rg_rules = st.text_area("Grammar (e.g., S -> aS | bA):", value="S -> aS | bA\nA -> bA | a", key="chomsky_rules")
+        rg_str = st.text_input("Test String:", value="aabba", key="chomsky_str")
+    with rg_c2:
+        st.info("""
+        **Linear Forms:**
+        - Right-linear: `A -> w B | w`
+        - Left-linear: `A -> B w | w`
+        - `w` is a string of terminals (or ε).
+        - A linear grammar is matched by an NFA in linear time, no parser needed.
+        """)
+
+    if st.button("🔍 Classify & Build NFA", use_container_width=True):
+        grammar = Grammar.from_mixed_text(rg_rules)
+        if not grammar.productions:
+            st.error("Please enter a grammar using `->` rules.")
+        else:
+            kind, reason = classify_linear(grammar)
+            if kind is None:
+                st.session_state.chomsky_nfa = None
+                st.warning(f"⚠️ **Not a regular grammar** (Type 2 or higher): {reason}")
+            else:
+                st.success(f"✅ **{kind}** grammar: Type 3 (Regular).")
+                nfa = grammar_to_nfa(grammar)
+                lab_nfa = to_lab_nfa(nfa)
+                st.session_state.chomsky_nfa = (rg_rules, lab_nfa)
+                names = {n["id"]: n["label"] for n in lab_nfa["nodes"]}
+
+                dot = 'digraph { rankdir=LR; bgcolor="transparent"; node [shape=circle, fontcolor=white, color=white, style=filled, fillcolor="#1e293b"]; edge [color=white, fontcolor=white]; '
+                dot += f'start [shape=none, label="", width=0, height=0]; start -> "{names[nfa["start"]]}"; '
+                for n in lab_nfa["nodes"]:
+                    shape = "doublecircle" if n["isFinal"] else "circle"
+                    color = "#10b981" if n["isFinal"] else ("#3b82f6" if n["isStart"] else "#1e293b")
+                    dot += f'"{n["label"]}" [shape={shape}, fillcolor="{color}"]; '
+                for e in nfa["edges"]:
+                    dot += f'"{names[e["from"]]}" -> "{names[e["to"]]}" [label="{e["label"]}"]; '
+                st.graphviz_chart(dot + "}")
+
+                tokens = get_tokenizer(grammar).tokenize(rg_str)
+                if nfa_accepts(nfa, tokens):
+                    st.success(f"✅ `{' '.join(tokens) or 'ε'}` is **accepted** by the NFA.")
+                else:
+                    st.error(f"❌ `{' '.join(tokens) or 'ε'}` is **rejected** by the NFA.")
+                if set(grammar.terminals) & {"e", "l", "λ"}:
+                    st.caption("⚠️ The NFA → DFA lab reads `e`, `l` and `λ` labels as ε-moves.")
+
+    sent = st.session_state.get("chomsky_nfa")
+    if sent and sent[0] == rg_rules:
+        if st.button("🔬 Open in NFA → DFA Lab", use_container_width=True):
+            st.session_state.current_nfa = sent[1]
+            st.session_state.unit1_topic = "2.6 NFA to DFA Conversion Lab"
+            st.rerun()
+
     if st.button("Next: 3.3 Parse Trees & Grammar Capabilities ➡️", use_container_width=True):
         st.session_state.unit1_topic = "3.3 Parse Trees & Grammar Capabilities"
         st.rerun()
@@ -265,6 +377,7 @@ def render_derivations():
         ]
         sel = random.choice(exs)
         st.session_state.rand_derivation = sel
+        st.session_state.rand_deriv_page = 0
 
     if "rand_derivation" in st.session_state:
         d = st.session_state.rand_derivation
@@ -297,65 +410,29 @@ def render_derivations():
         
         st.info(f"**Target String:** `{d['str']}` ({d.get('gram_desc', '')})")
         
-        # BFS Searcher logic
-        N_set = set(d['N'])
-        nt_regex = "|".join([re.escape(nt) for nt in sorted(list(N_set), key=len, reverse=True)])
+        # Earley membership check first: a string outside the language would
+        # otherwise send the search all the way to its state budget
+        ex_grammar = Grammar.from_string_rules(d['rules'])
+        ex_target = split_sentential(d['str'])
+        forest = EarleyParser(ex_grammar).parse(ex_target)
+        in_language = forest.accepted
+        engine = DerivationEngine(ex_grammar)
 
         def solve(mode="LMD"):
-            from collections import deque
-            # Handle ε, e, lambda in grammar
-            clean_grammar = {}
-            for line in d['rules'].split("|"):
-                if "->" in line:
-                    lhs, rhs = line.split("->")
-                    lhs = lhs.strip(); rhs = rhs.strip()
-                else:
-                    lhs = d['S']; rhs = line.strip()
-                
-                if lhs not in clean_grammar: clean_grammar[lhs] = []
-                rhs_clean = "" if rhs.strip() in ["ε", "e", "lambda"] else rhs.strip()
-                clean_grammar[lhs].append(rhs_clean)
-
-                target_norm = " ".join(d['str'].split())
-                queue = deque([(d['S'], [d['S']])])
-                visited = {} # string -> shortest_path_length
-                visited[d['S']] = 0
-                all_shortest_paths = []
-                shortest_len = float('inf')
-                
-                while queue:
-                    curr, path = queue.popleft()
-                    if len(path) > shortest_len: break
-                    
-                    if " ".join(curr.split()) == target_norm:
-                        shortest_len = len(path)
-                        all_shortest_paths.append(path)
-                        continue
-                    
-                    if len(curr) > len(d['str']) + 15: continue
-                    matches = list(re.finditer(nt_regex, curr))
-                    if not matches: continue
-                    m = matches[0] if mode == "LMD" else matches[-1]
-                    target_nt = m.group(); idx = m.start()
-                    for replacement in clean_grammar.get(target_nt, []):
-                        new_str = curr[:idx] + replacement + curr[idx + len(target_nt):]
-                        if new_str not in visited or visited[new_str] == len(path):
-                            visited[new_str] = len(path)
-                            queue.append((new_str, path + [new_str]))
-            
-            unique_paths = []
-            for p in all_shortest_paths:
-                if p not in unique_paths: unique_paths.append(p)
-            return unique_paths
+            # Shortest derivations, generated lazily over token-ID sentential forms
+            if not in_language:
+                return
+            for path in engine.shortest_derivations(ex_target, mode):
+                yield ["".join(form) for form in path]
 
-        def render_deriv_steps(paths, title, align="left"):
+        def render_deriv_steps(paths, title, align="left", start=0):
             st.markdown(f"##### {title}")
             if not paths:
-                st.warning("No derivation found")
+                st.warning("No derivation found" if not start else "No more paths")
                 return
 
-            for idx, steps in enumerate(paths):
-                if len(paths) > 1:
+            for idx, steps in enumerate(paths, start):
+                if len(paths) > 1 or start:
                     st.caption(f"Path Option {idx + 1}:")
                 
                 deriv_html = []
@@ -379,17 +456,23 @@ def render_derivations():
                 """, unsafe_allow_html=True)
 
         st.markdown("---")
-        l_paths = solve("LMD")
-        r_paths = solve("RMD")
+        page = st.session_state.get("rand_deriv_page", 0)
+        l_paths, l_more = take_page(solve("LMD"), page)
+        r_paths, r_more = take_page(solve("RMD"), page)
 
         # Ambiguity Status for Random Examples
-        if len(l_paths) > 1:
+        tree_count = forest.count_trees()
+        if tree_count > 1:
             st.error("⚖️ **Note:** This example grammar is **AMBIGUOUS** for this string!")
-            st.warning(f"Found {len(l_paths)} distinct Left-Most Derivations.")
+            if tree_count == math.inf:
+                st.warning("The string has infinitely many parse trees (a non-terminal derives itself).")
+            else:
+                st.warning(f"The string has {tree_count:,} distinct parse trees (Left-Most Derivations).")
         
         c1, c2 = st.columns(2)
-        with c1: render_deriv_steps(l_paths, "⬅️ Left-Most Derivation", align="left")
-        with c2: render_deriv_steps(r_paths, "➡️ Right-Most Derivation", align="right")
+        with c1: render_deriv_steps(l_paths, "⬅️ Left-Most Derivation", align="left", start=page * DERIVATIONS_PER_PAGE)
+        with c2: render_deriv_steps(r_paths, "➡️ Right-Most Derivation", align="right", start=page * DERIVATIONS_PER_PAGE)
+        render_pager("rand_deriv_page", l_more or r_more)
 
     st.markdown("---")
     st.subheader("🛠️ Interactive Derivation Lab")
@@ -399,6 +482,7 @@ def render_derivations():
     with col1:
         user_rules = st.text_area("Enter Rules (one per line, e.g., S -> aS | b)", value="E -> E+E | id")
         user_string = st.text_input("Target String (e.g., id+id):", value="id+id")
+        strategy = st.radio("Search strategy:", list(DERIVATION_STRATEGIES), horizontal=True, key="deriv_strategy")
     
     with col2:
         st.caption("Instructions:")
@@ -406,9 +490,15 @@ def render_derivations():
         - Use `->` for rules.
         - Use `|` for multiple choices.
         - First rule's LHS is the **Start Symbol**.
+        - **Bidirectional** search expands from the start symbol and reduces from the target until they meet.
         """)
 
     if st.button("🧩 Solve Derivation"):
+        st.session_state.deriv_run = (user_rules, user_string, strategy)
+        st.session_state.deriv_page = 0
+
+    # Results stay up across reruns (e.g. paging) until the inputs change
+    if st.session_state.get("deriv_run") == (user_rules, user_string, strategy):
         # Improved Parser for User Grammar
         grammar = {}
         start_sym = None
@@ -463,87 +553,56 @@ def render_derivations():
                 for p in P_list:
                     st.write(f"&nbsp;&nbsp;&nbsp;&nbsp;• {p}")
 
-            # --- Improved BFS Derivation Searcher ---
-            from collections import deque
-            
-            # Sort NTs by length descending to match longest possible NT first
-            sorted_nts = sorted(list(N), key=len, reverse=True)
-            nt_regex = "|".join([re.escape(nt) for nt in sorted_nts])
+            # --- Token-ID Derivation Searcher ---
+            user_grammar = Grammar.from_string_rules(user_rules)
+            target = split_sentential(user_string)
+            forest = EarleyParser(user_grammar).parse(target)
+            in_language = forest.accepted
+            engine = DerivationEngine(user_grammar)
 
             def get_derivations(mode="LMD"):
-                # Returns a list of all shortest paths
-                target_norm = " ".join(user_string.split())
-                queue = deque([(start_sym, [start_sym])])
-                visited = {} # string -> shortest_path_length
-                visited[start_sym] = 0
-                all_shortest_paths = []
-                shortest_len = float('inf')
-                
-                while queue:
-                    curr, path = queue.popleft()
-                    
-                    if len(path) > shortest_len:
-                        break # Found all shortest paths already
-                        
-                    if " ".join(curr.split()) == target_norm:
-                        shortest_len = len(path)
-                        all_shortest_paths.append(path)
-                        continue
-                        
-                    if len(curr) > len(user_string) + 15: continue
-                    if len(path) > 15: continue # Safety break
-                    
-                    # Find all non-terminals in current sentential form
-                    matches = list(re.finditer(nt_regex, curr))
-                    if not matches: continue
-                    
-                    # Pick target NT based on mode
-                    m = matches[0] if mode == "LMD" else matches[-1]
-                    target_nt = m.group()
-                    idx = m.start()
-
-                    for replacement in grammar.get(target_nt, []):
-                        new_str = curr[:idx] + replacement + curr[idx + len(target_nt):]
-                        
-                        # In BFS, the first time we see a node it's via the shortest path.
-                        # However, we want to find ALL paths of that same shortest length.
-                        if new_str not in visited or visited[new_str] == len(path):
-                            visited[new_str] = len(path)
-                            queue.append((new_str, path + [new_str]))
-                
-                # Filter to unique paths (standard LMD should be unique if same choices, but BFS might explore overlap)
-                unique_paths = []
-                for p in all_shortest_paths:
-                    if p not in unique_paths:
-                        unique_paths.append(p)
-                return unique_paths
+                # Yields shortest paths lazily
+                if not in_language:
+                    return
+                if DERIVATION_STRATEGIES[strategy] == "bidirectional":
+                    path = engine.bidirectional_derivation(target, mode)
+                    paths = [path] if path else []
+                else:
+                    paths = engine.shortest_derivations(target, mode)
+                for path in paths:
+                    yield ["".join(form) for form in path]
 
-            lmd_paths = get_derivations("LMD")
-            rmd_paths = get_derivations("RMD")
+            page = st.session_state.get("deriv_page", 0)
+            lmd_paths, lmd_more = take_page(get_derivations("LMD"), page)
+            rmd_paths, rmd_more = take_page(get_derivations("RMD"), page)
 
             st.markdown("---")
             
             # --- Ambiguity Result ---
-            is_ambiguous = len(lmd_paths) > 1
+            tree_count = forest.count_trees()
+            is_ambiguous = tree_count > 1
             if is_ambiguous:
                 st.error("⚖️ **Grammar is AMBIGUOUS!**")
-                st.warning(f"Found {len(lmd_paths)} distinct Left-Most Derivation paths for `{user_string}`.")
+                if tree_count == math.inf:
+                    st.warning(f"`{user_string}` has infinitely many parse trees (a non-terminal derives itself).")
+                else:
+                    st.warning(f"`{user_string}` has {tree_count:,} distinct parse trees.")
             else:
-                if lmd_paths:
-                    st.success("⚖️ **Grammar is UNAMBIGUOUS** (for this string shortest path).")
+                if tree_count:
+                    st.success("⚖️ **Grammar is UNAMBIGUOUS** for this string (exactly one parse tree).")
                 else:
                     st.error("❌ No derivation found for the given string.")
 
             c1, c2 = st.columns(2)
             
-            def render_interactive_box(paths, title, align="left"):
+            def render_interactive_box(paths, title, align="left", start=0):
                 st.markdown(f"##### {title}")
                 if not paths:
-                    st.warning("No path found")
+                    st.warning("No path found" if not start else "No more paths")
                     return
 
-                for idx, steps in enumerate(paths):
-                    if len(paths) > 1:
+                for idx, steps in enumerate(paths, start):
+                    if len(paths) > 1 or start:
                         st.caption(f"Path Option {idx + 1}:")
                     
                     deriv_html = []
@@ -566,8 +625,9 @@ def render_derivations():
                         </div>
                     """, unsafe_allow_html=True)
 
-            with c1: render_interactive_box(lmd_paths, "⬅️ Left-Most Derivation", align="left")
-            with c2: render_interactive_box(rmd_paths, "➡️ Right-Most Derivation", align="right")
+            with c1: render_interactive_box(lmd_paths, "⬅️ Left-Most Derivation", align="left", start=page * DERIVATIONS_PER_PAGE)
+            with c2: render_interactive_box(rmd_paths, "➡️ Right-Most Derivation", align="right", start=page * DERIVATIONS_PER_PAGE)
+            render_pager("deriv_page", lmd_more or rmd_more)
                 
         except Exception as e:
             st.error(f"Solver Error: {e}")
@@ -650,93 +710,44 @@ T -> id
         **Solver Logic:**
         - This tool finds a sequence of **Reductions** (L.H.S. replacements) that lead back to the Start Symbol.
         - It's essentially the inverse of a Right-Most Derivation.
+        - Ambiguous grammar? Add `%left '+'` / `%right '^'` lines and the reductions come straight from an LALR(1) table.
         """)
 
     if st.button("🔍 Solve Step-by-Step Reduction", use_container_width=True):
-        from collections import deque
-        import re
         try:
             # 1. Parse Grammar & Extract All Symbols
-            grammar_list = []
-            non_terminals = set()
-            all_grammar_symbols = set()
-            start_symbol = None
-            
-            for line in u_rules_redir.split("\n"):
-                if "->" in line:
-                    lhs, rhs_blob = line.split("->")
-                    lhs = lhs.strip()
-                    if not start_symbol: start_symbol = lhs
-                    non_terminals.add(lhs)
-                    all_grammar_symbols.add(lhs)
-                    # Extract tokens from RHS to build a master lexer
-                    rhs_opts = rhs_blob.split("|")
-                    for opt in rhs_opts:
-                        # Extract symbols like alphanumeric words or single special chars
-                        syms = re.findall(r"[a-zA-Z0-9]+|[^a-zA-Z0-9\s]", opt)
-                        grammar_list.append((lhs, syms))
-                        for s in syms: all_grammar_symbols.add(s)
-
-            # 2. Robust Tokenizer (Reuse logic from Shift-Reduce fix)
-            sorted_symbols = sorted(list(all_grammar_symbols), key=len, reverse=True)
-            token_regex = "|".join([re.escape(s) for s in sorted_symbols if s.strip()])
-
-            def intelligent_tokenize(text):
-                # If there are spaces, tokenize by spaces first, then check bits
-                if " " in text.strip():
-                    raw_parts = text.strip().split()
-                    out = []
-                    for p in raw_parts:
-                        found = re.findall(token_regex, p, re.IGNORECASE)
-                        out.extend(found if found else [p])
-                    return out
-                else:
-                    # No spaces: use the grammar symbols to partition the string
-                    return re.findall(token_regex, text, re.IGNORECASE)
-
-            # Map tokens back to the exact case used in the grammar
-            raw_input_tokens = intelligent_tokenize(u_str_redir)
-            input_tokens = []
-            for rit in raw_input_tokens:
-                match = next((s for s in all_grammar_symbols if s == rit), None)
-                if not match:
-                    match = next((s for s in all_grammar_symbols if s.lower() == rit.lower()), rit)
-                input_tokens.append(match)
+            grammar = Grammar.from_text(u_rules_redir)
+            if not grammar.productions:
+                st.error("Please enter a grammar using `->` rules.")
+                return
+
+            # 2. Robust Tokenizer: a case-folding trie over the grammar's symbols
+            # splits each word by longest match and returns the grammar's spelling
+            tokenizer = get_tokenizer(grammar, fold_case=True)
+            input_tokens = tokenizer.tokenize(u_str_redir)
 
             st.info(f"🔍 **Detected Tokens:** `{'`, `'.join(input_tokens)}`")
 
-            # 3. BFS Reduction Search
-            queue = deque([(tuple(input_tokens), [])])
-            visited = set()
+            # 3a. With %left/%right declarations an LALR(1) table settles the
+            # ambiguity, so its reductions give the answer in linear time
             final_path = None
-            max_states = 2000
-            count = 0
-
-            # Sort grammar by RHS length (longest first) for slightly better search
-            sorted_grammar = sorted(grammar_list, key=lambda x: len(x[1]), reverse=True)
-
-            while queue and count < max_states:
-                curr_tokens, history = queue.popleft()
-                count += 1
-                
-                if curr_tokens in visited: continue
-                visited.add(curr_tokens)
-
-                # Check Success
-                if list(curr_tokens) == [start_symbol]:
-                    final_path = history + [{"Current String": " ".join(curr_tokens), "Reduction Applied": "**Start Symbol reached**", "Rule Used": "-"}]
-                    break
-
-                # Try all possible reductions
-                for lhs, rhs in sorted_grammar:
-                    n = len(rhs)
-                    if not rhs or rhs == [""]: continue
-                    for i in range(len(curr_tokens) - n + 1):
-                        if list(curr_tokens[i:i+n]) == rhs:
-                            new_toks = curr_tokens[:i] + (lhs,) + curr_tokens[i+n:]
-                            action = f"Replace `{' '.join(rhs)}` with `{lhs}`"
-                            new_hist = history + [{"Current String": " ".join(curr_tokens), "Reduction Applied": action, "Rule Used": f"{lhs} → {' '.join(rhs)}"}]
-                            queue.append((new_toks, new_hist))
+            table = get_lr_table(grammar, "LALR(1)") if grammar.precedence else None
+            if table is not None and not table.conflicts:
+                history, error = table.parse(input_tokens)
+                if not error:
+                    final_path = lr_reduction_rows(history)
+                    st.caption(f"⚖️ Reductions from the LALR(1) table; {len(table.resolved)} conflict(s) settled by the precedence declarations.")
+
+            # 3b. Guided Reduction Search: shift/reduce moves kept to viable
+            # prefixes of the LR(0) automaton, best-first on the remaining work
+            if final_path is None:
+                steps = ReductionSearch(grammar).solve(input_tokens, max_states=2000)
+                if steps:
+                    final_path = [
+                        {"Current String": " ".join(form), "Reduction Applied": f"Replace `{' '.join(rhs) or 'ε'}` with `{lhs}`", "Rule Used": f"{lhs} → {' '.join(rhs) or 'ε'}"}
+                        for form, (lhs, rhs) in steps[:-1]
+                    ]
+                    final_path.append({"Current String": " ".join(steps[-1][0]), "Reduction Applied": "**Start Symbol reached**", "Rule Used": "-"})
 
             if final_path:
                 st.subheader("📊 Reduction Table")
@@ -749,7 +760,7 @@ T -> id
                 **Possible Reasons:**
                 1. **Grammar Mismatch:** Your grammar might be missing a rule (e.g., if you have `cond` in the string but no rule like `S -> if E then ...`).
                 2. **Start Symbol:** The parser assumed the first non-terminal defined is your target Start Symbol.
-                3. **Complex Conflicts:** Some reductions might prevent others (though BFS usually finds a path if one exists).
+                3. **Search Budget:** The guided search stops after exploring a fixed number of parser configurations.
                 """)
 
         except Exception as e:
@@ -915,7 +926,7 @@ def render_parse_tree_notes():
 
     st.markdown("---")
     st.header("5. 🧪 Live Ambiguity Test Lab")
-    st.write("Enter your grammar rules and a target string. If the system finds more than one shortest Left-Most Derivation (LMD), the grammar is officially **Ambiguous** for that string.")
+    st.write("Enter your grammar rules and a target string. The number of parse trees is counted exactly. If the string has more than one Left-Most Derivation (LMD), i.e. more than one parse tree, the grammar is officially **Ambiguous** for that string.")
 
     lab_c1, lab_c2 = st.columns([2, 1])
     with lab_c1:
@@ -930,90 +941,72 @@ def render_parse_tree_notes():
         """)
 
     if st.button("⚖️ Run Ambiguity Test", use_container_width=True):
+        st.session_state.ambig_run = (u_rules, u_str)
+        st.session_state.ambig_page = 0
+
+    # Results stay up across reruns (e.g. paging) until the inputs change
+    if st.session_state.get("ambig_run") == (u_rules, u_str):
         # --- Local Solver for Ambiguity Lab ---
-        from collections import deque
         try:
-            grammar = {}
-            start_sym = None
-            N = set()
-            
-            for line in u_rules.split("\n"):
-                line = line.strip()
-                if not line or "->" not in line: continue
-                lhs, rhs = line.split("->")
-                lhs = lhs.strip(); rhs = [c.strip() for c in rhs.split("|")]
-                if not start_sym: start_sym = lhs
-                N.add(lhs)
-                if lhs not in grammar: grammar[lhs] = []
-                for r in rhs:
-                    clean_r = "" if r.strip() in ["ε", "e", "lambda"] else r.strip()
-                    grammar[lhs].append(clean_r)
-
-            sorted_nts = sorted(list(N), key=len, reverse=True)
-            nt_reg = "|".join([re.escape(nt) for nt in sorted_nts])
-
-            def find_all_lmds(target):
-                target_norm = " ".join(target.split())
-                queue = deque([(start_sym, [start_sym])])
-                visited = {} # string -> min_steps
-                visited[start_sym] = 0
-                results = []
-                min_len = float('inf')
-                
-                while queue:
-                    curr, path = queue.popleft()
-                    if len(path) > min_len: break
-                    
-                    if " ".join(curr.split()) == target_norm:
-                        min_len = len(path)
-                        if path not in results: results.append(path)
-                        continue
-                    
-                    if len(curr) > len(target) + 15: continue
-                    if len(path) > 15: continue
-                    
-                    matches = list(re.finditer(nt_reg, curr))
-                    if not matches: continue
-                    
-                    m = matches[0] # Always Left-Most for LMD
-                    t_nt = m.group(); idx = m.start()
-                    for repl in grammar.get(t_nt, []):
-                        nxt = curr[:idx] + repl + curr[idx + len(t_nt):]
-                        if nxt not in visited or visited[nxt] == len(path):
-                            visited[nxt] = len(path)
-                            queue.append((nxt, path + [nxt]))
-                return results
-
-            steps_list = find_all_lmds(u_str)
+            grammar = Grammar.from_string_rules(u_rules)
+            if grammar.start is None:
+                raise ValueError("No rules found.")
+
+            forest = EarleyParser(grammar).parse(split_sentential(u_str))
+            # Exact tree count by DP over the forest, without enumerating
+            tree_count = forest.count_trees()
+
+            def find_all_lmds(forest):
+                # Every parse tree in the Earley forest is one distinct LMD, built on demand
+                for tree in forest.trees():
+                    yield ["".join(form) for form in tree_derivation(tree)]
+
+            page = st.session_state.get("ambig_page", 0)
+            try:
+                steps_list, has_next = take_page(find_all_lmds(forest), page)
+                paths_error = None
+            except (RecursionError, MemoryError) as e:
+                # Listing paths is optional; the count above is already exact
+                steps_list, has_next = [], False
+                paths_error = type(e).__name__
+            first = page * DERIVATIONS_PER_PAGE
 
             st.markdown("### 📊 Test Result")
-            if not steps_list:
+            if not tree_count:
                 st.error("❌ **No derivation found.** The string cannot be generated by this grammar.")
-            elif len(steps_list) > 1:
+            elif tree_count > 1:
                 st.error(f"⚖️ **Status: AMBIGUOUS**")
-                st.warning(f"Found **{len(steps_list)}** distinct Left-Most Derivations for `{u_str}`.")
+                if tree_count == math.inf:
+                    st.warning(f"`{u_str}` has **infinitely many** parse trees: some non-terminal derives itself (A ⇒+ A).")
+                else:
+                    st.warning(f"Found **{tree_count:,}** distinct Left-Most Derivations (parse trees) for `{u_str}`.")
+                if paths_error:
+                    st.caption(f"⚠️ The derivation paths are too large to list here ({paths_error}); the count above is exact.")
                 
-                # Show all paths side-by-side or in sequence
-                cols = st.columns(len(steps_list))
+                # Show one page of paths side-by-side
+                cols = st.columns(max(len(steps_list), 1))
                 for i, path in enumerate(steps_list):
                     with cols[i]:
-                        st.caption(f"Path Option {i+1}:")
+                        st.caption(f"Path Option {first + i + 1}:")
                         html = []
                         for j, step in enumerate(path):
                             disp = step if step != "" else "ε"
                             line = f"{disp}" if j == 0 else f"&#8658; {disp}"
                             html.append(f"<div style='margin-bottom: 5px; font-family: monospace;'>{line}</div>")
                         st.markdown(f"<div style='background: #111827; padding:15px; border-radius:10px; border:1px solid #ef4444;'>{''.join(html)}</div>", unsafe_allow_html=True)
+                render_pager("ambig_page", has_next)
             else:
                 st.success("⚖️ **Status: UNAMBIGUOUS**")
-                st.info(f"Only one shortest Left-Most Derivation found for `{u_str}`. This suggests the grammar is unambiguous for this specific string.")
-                path = steps_list[0]
-                html = []
-                for j, step in enumerate(path):
-                    disp = step if step != "" else "ε"
-                    line = f"{disp}" if j == 0 else f"&#8658; {disp}"
-                    html.append(f"<div style='margin-bottom: 5px; font-family: monospace;'>{line}</div>")
-                st.markdown(f"<div style='background: #111827; padding:15px; border-radius:10px; border:1px solid #10b981;'>{''.join(html)}</div>", unsafe_allow_html=True)
+                st.info(f"Exactly one Left-Most Derivation (one parse tree) exists for `{u_str}`, so the grammar is unambiguous for this specific string.")
+                if paths_error:
+                    st.caption(f"⚠️ The derivation path is too large to list here ({paths_error}).")
+                for path in steps_list[:1]:
+                    html = []
+                    for j, step in enumerate(path):
+                        disp = step if step != "" else "ε"
+                        line = f"{disp}" if j == 0 else f"&#8658; {disp}"
+                        html.append(f"<div style='margin-bottom: 5px; font-family: monospace;'>{line}</div>")
+                    st.markdown(f"<div style='background: #111827; padding:15px; border-radius:10px; border:1px solid #10b981;'>{''.join(html)}</div>", unsafe_allow_html=True)
 
         except Exception as e:
             st.error(f"Error in Ambiguity Checker: {e}")
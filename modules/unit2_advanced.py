@@ -2,6 +2,14 @@ import streamlit as st
 import re
 import pandas as pd
 
+from modules.unit1_ll1 import compute_first_follow_v2, tokenize
+from utils.grammar import Grammar
+from utils.earley import EarleyParser
+from utils.lr_engine import get_lr_table
+from utils.ll1_engine import compile_ll1_table
+from utils.parser_bench import benchmark_parsers
+from utils.sentence_gen import SentenceGenerator
+
 def render_advanced_intro():
     st.title("🚀 8.0 & 8.1 Advanced Topics: Objectives & Introduction")
     
@@ -494,6 +502,63 @@ def render_advanced_debugging():
 
     st.divider()
 
+    # --- PRACTICAL: GRAMMAR FUZZER ---
+    st.info("🎲 **Practical Lab: Grammar Fuzzer**")
+    st.markdown("""
+    Fuzzing a parser needs inputs that are **valid** but unpredictable. The generator counts, for every non-terminal,
+    how many derivations of each length it has (exact big integers), then samples each choice in proportion to those
+    counts, so every derivation of the chosen length is **equally likely**. The sentences are then fed to several
+    parsing engines: a sentence that any engine rejects points to a bug (or a grammar that engine cannot handle).
+    """)
+
+    fz_c1, fz_c2 = st.columns([2, 1])
+    with fz_c1:
+        fz_rules = st.text_area("Grammar:", value="E -> T E'\nE' -> + T E' | ε\nT -> F T'\nT' -> * F T' | ε\nF -> ( E ) | id",
+                                height=150, key="fuzz_rules")
+    with fz_c2:
+        fz_length = int(st.number_input("Sentence length (tokens):", min_value=0, max_value=500, value=15, key="fuzz_length"))
+        fz_count = int(st.number_input("Sentences:", min_value=1, max_value=100000, value=1000, step=100, key="fuzz_count"))
+        fz_seed = int(st.number_input("Random seed:", min_value=0, value=42, key="fuzz_seed"))
+
+    if st.button("🎲 Generate & Cross-Check", use_container_width=True):
+        grammar = Grammar.from_text(fz_rules, tokenizer=tokenize)
+        if not grammar.productions:
+            st.error("Please enter a grammar using `->` rules.")
+        else:
+            generator = SentenceGenerator(grammar, max_length=fz_length, seed=fz_seed)
+            total = generator.count(fz_length)
+            if not total:
+                lengths = generator.lengths()
+                st.warning(f"⚠️ The grammar has no sentence of length {fz_length}."
+                           + (f" Lengths up to {fz_length} that have sentences: {', '.join(map(str, lengths[:15]))}{' …' if len(lengths) > 15 else ''}" if lengths else ""))
+            else:
+                st.success(f"✅ **{total:,}** derivation(s) of length {fz_length}; sampling {fz_count:,} uniformly.")
+                corpus = list(generator.sentences(fz_length, fz_count))
+                text = "".join(" ".join(tokens) + "\n" for tokens in corpus)
+                st.dataframe(pd.DataFrame({"Sample Sentence": [" ".join(tokens) for tokens in corpus[:20]]}), use_container_width=True)
+                st.download_button("⬇️ Download Corpus", text, file_name=f"corpus_len{fz_length}.txt", use_container_width=True)
+
+                parsers = {"Earley": EarleyParser(grammar).recognize}
+                lalr = get_lr_table(grammar, "LALR(1)")
+                if not lalr.conflicts:
+                    parsers["LALR(1)"] = lalr.recognize
+                firsts, follows, nts, terms, rules = compute_first_follow_v2(fz_rules)
+                ll1 = compile_ll1_table(firsts, follows, nts, terms, rules)
+                if not ll1.conflicts:
+                    parsers["LL(1)"] = ll1.recognize
+                rows = benchmark_parsers(parsers, {f"{fz_count:,} × {fz_length} tokens": corpus}, repeat=1)
+                for row in rows:
+                    row["Rejected"] = None if row["Accepted"] is None else row["Inputs"] - row["Accepted"]
+                st.dataframe(pd.DataFrame(rows), use_container_width=True)
+                if any(row["Rejected"] for row in rows):
+                    st.error("❌ Some engine rejected sentences the grammar generates.")
+                else:
+                    st.success(f"✅ All {len(rows)} engine(s) accept every generated sentence.")
+                if len(parsers) < 3:
+                    st.caption("Engines whose table has conflicts for this grammar (LALR(1), LL(1)) are left out.")
+
+    st.divider()
+
     # Navigation
     nav1, nav2 = st.columns(2)
     with nav1:
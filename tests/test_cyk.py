@@ -0,0 +1,31 @@
+from itertools import product
+
+from utils.cyk import CYKParser
+from utils.earley import EarleyParser
+from utils.grammar import Grammar
+
+# ε-rules, unit chains, long bodies and terminals mixed into bodies
+GRAMMARS = [
+    "E -> E + T | T\nT -> T * F | F\nF -> ( E ) | a",
+    "S -> a S b S | b S a S | ε",
+    "S -> A B | C\nA -> a A | ε\nB -> b | C\nC -> S c | a",
+]
+
+def strings(terminals, max_length):
+    for n in range(max_length + 1):
+        yield from (list(w) for w in product(terminals, repeat=n))
+
+def test_cnf_rules_have_the_normal_form():
+    for text in GRAMMARS:
+        cnf = CYKParser(Grammar.from_text(text)).cnf
+        for lhs, rhs in cnf.productions:
+            assert (len(rhs) == 2 and all(cnf.is_nonterminal(s) for s in rhs)
+                    or len(rhs) == 1 and not cnf.is_nonterminal(rhs[0])
+                    or not rhs and lhs == cnf.start)
+
+def test_cyk_agrees_with_earley():
+    for text in GRAMMARS:
+        grammar = Grammar.from_text(text)
+        cyk, earley = CYKParser(grammar), EarleyParser(grammar)
+        for w in strings(grammar.terminals, 5):
+            assert cyk.recognize(w) == earley.recognize(w), (text, w)
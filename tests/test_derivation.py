@@ -0,0 +1,41 @@
+from utils.derivation import DerivationEngine
+from utils.grammar import Grammar
+
+AMBIGUOUS = Grammar.from_text("E -> E + E | E * E | a")
+TARGET = "a + a * a".split()
+
+def is_derivation(grammar, forms, target, leftmost=True):
+    # Each step rewrites the leftmost (rightmost) non-terminal by one of its productions
+    if forms[0] != [grammar.start] or forms[-1] != target:
+        return False
+    bodies = {(lhs, tuple(rhs)) for lhs, rhs in grammar.productions}
+    for form, nxt in zip(forms, forms[1:]):
+        nts = [i for i, s in enumerate(form) if grammar.is_nonterminal(s)]
+        if not nts:
+            return False
+        k = nts[0] if leftmost else nts[-1]
+        tail = len(form) - k - 1
+        body = tuple(nxt[k:len(nxt) - tail])
+        if nxt[:k] != form[:k] or nxt[len(nxt) - tail:] != form[k + 1:] or (form[k], body) not in bodies:
+            return False
+    return True
+
+def test_every_shortest_lmd_is_one_parse_tree():
+    paths = list(DerivationEngine(AMBIGUOUS).shortest_derivations(TARGET))
+    assert len(paths) == 2
+    assert all(is_derivation(AMBIGUOUS, forms, TARGET) for forms in paths)
+
+def test_rmd_and_epsilon_rules():
+    grammar = Grammar.from_text("S -> a S b S | ε")
+    target = "a a b b a b".split()
+    paths = list(DerivationEngine(grammar).shortest_derivations(target, mode="RMD"))
+    assert paths and all(is_derivation(grammar, forms, target, leftmost=False) for forms in paths)
+
+def test_bidirectional_finds_a_shortest_derivation():
+    engine = DerivationEngine(AMBIGUOUS)
+    shortest = next(engine.shortest_derivations(TARGET))
+    for mode in ("LMD", "RMD"):
+        forms = engine.bidirectional_derivation(TARGET, mode=mode)
+        assert is_derivation(AMBIGUOUS, forms, TARGET, leftmost=mode == "LMD")
+        assert len(forms) == len(shortest)
+    assert engine.bidirectional_derivation(["a", "+"]) is None
@@ -0,0 +1,22 @@
+from utils.earley import EarleyParser
+from utils.grammar import Grammar
+
+CATALAN = [1, 1, 2, 5, 14, 42, 132]
+
+def sums(n):
+    return " + ".join(["a"] * n).split()
+
+def test_tree_count_of_sums_is_catalan():
+    parser = EarleyParser(Grammar.from_text("E -> E + E | a"))
+    for n in range(1, len(CATALAN) + 1):
+        forest = parser.parse(sums(n))
+        assert forest.count_trees() == CATALAN[n - 1]
+        assert len(set(forest.trees())) == CATALAN[n - 1]
+
+def test_trees_of_input_nested_deeper_than_the_recursion_limit():
+    depth = 2000
+    forest = EarleyParser(Grammar.from_text("S -> ( S ) | a")).parse(["("] * depth + ["a"] + [")"] * depth)
+    tree, = forest.trees()
+    for _ in range(depth):
+        tree = tree[2][1]
+    assert tree == ("S", 1, ("a",))
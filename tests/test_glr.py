@@ -0,0 +1,21 @@
+from utils.glr import GLRParser, shift_reduce_trace
+from utils.grammar import Grammar
+from utils.lr_engine import get_lr_table
+
+CATALAN = [1, 1, 2, 5, 14, 42, 132]
+
+def test_tree_count_of_sums_is_catalan():
+    parser = GLRParser(get_lr_table(Grammar.from_text("E -> E + E | a"), "LALR(1)"))
+    for n in range(1, len(CATALAN) + 1):
+        forest = parser.parse(" + ".join(["a"] * n).split())
+        assert forest.count_trees() == CATALAN[n - 1]
+        assert len(set(forest.trees())) == CATALAN[n - 1]
+
+def test_first_tree_of_input_nested_deeper_than_the_recursion_limit():
+    # 'a' reduces to A or B, so the LALR(1) table has a conflict on every level
+    table = get_lr_table(Grammar.from_text("S -> A S b | B S c | x\nA -> a\nB -> a"), "LALR(1)")
+    depth = 1500
+    tokens = ["a"] * depth + ["x"] + ["c"] * depth
+    assert table.conflicts and table.parse(tokens)[1]
+    rows = shift_reduce_trace(next(GLRParser(table).parse(tokens).trees()), tokens)
+    assert rows[-1] == {"Stack": "$ S", "Input": "$", "Action": "Accept"}
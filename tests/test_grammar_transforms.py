@@ -0,0 +1,44 @@
+from itertools import product
+
+from utils.earley import EarleyParser
+from utils.grammar import Grammar
+from utils.grammar_transforms import left_factor, normalize
+
+# Nullable start, unit chains, a unit cycle and useless symbols
+MESSY = Grammar.from_text("S -> A B | C | ε\nA -> a A | ε | C\nB -> b | A\nC -> S c | C | D\nD -> D d\nE -> e")
+
+def strings(terminals, max_length):
+    for n in range(max_length + 1):
+        yield from (list(w) for w in product(terminals, repeat=n))
+
+def same_language(g1, g2, terminals, max_length=5):
+    p1, p2 = EarleyParser(g1), EarleyParser(g2)
+    return all(p1.recognize(w) == p2.recognize(w) for w in strings(terminals, max_length))
+
+def test_normalize_keeps_the_language():
+    terminals = sorted(MESSY.terminals)
+    for epsilon, unit in product((False, True), repeat=2):
+        result, _ = normalize(MESSY, epsilon=epsilon, unit=unit)
+        assert same_language(MESSY, result, terminals), (epsilon, unit)
+
+def test_normalize_removes_epsilon_unit_and_useless_rules():
+    result, report = normalize(MESSY, epsilon=True, unit=True)
+    for lhs, rhs in result.productions:
+        assert rhs or lhs == result.start
+        assert not (len(rhs) == 1 and result.is_nonterminal(rhs[0]))
+    assert not {"D", "E"} & set(result.nonterminals)
+    assert report
+
+def test_left_factor_dangling_else():
+    grammar = Grammar.from_text("S -> i E t S | i E t S e S | a\nE -> b")
+    result, report = left_factor(grammar)
+    assert result.to_text() == "S -> i E t S S' | a\nS' -> ε | e S\nE -> b"
+    assert len(report) == 1
+
+def test_left_factor_leaves_distinct_first_symbols_and_the_same_language():
+    grammar = Grammar.from_text("A -> a b c | a b d | a b | a e | f | f g A")
+    result, _ = left_factor(grammar)
+    for nt in result.nonterminals:
+        firsts = [result.productions[p][1][:1] for p in result.prods_of[nt]]
+        assert len(firsts) == len(set(firsts)), nt
+    assert same_language(grammar, result, sorted(grammar.terminals))
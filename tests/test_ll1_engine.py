@@ -0,0 +1,31 @@
+from utils.ll1_engine import LL1Table
+
+# S -> ( S ) S | ε
+FIRSTS = {"S": {"(", "ε"}}
+FOLLOWS = {"S": {")", "$"}}
+RULES = {"S": [["(", "S", ")", "S"], ["ε"]]}
+
+def balanced_table():
+    return LL1Table(FIRSTS, FOLLOWS, ["S"], ["(", ")"], RULES)
+
+def test_extra_input_restarts_only_on_first_of_start():
+    # ')' is in M[S, )] only through FOLLOW(S); restarting on it predicted ε forever
+    _, errors = balanced_table().parse_with_recovery(["(", ")", ")"])
+    assert len(errors) == 1
+    assert errors[0]["Position"] == 3
+    assert errors[0]["Recovery"] == "Skipped 1 token(s)"
+
+def test_extra_input_drops_offending_token_before_restart():
+    _, errors = balanced_table().parse_with_recovery(["(", ")", ")", "(", ")"])
+    assert [e["Recovery"] for e in errors] == ["Skipped 1 token(s), restarted S"]
+
+def test_recovery_that_consumes_nothing_cannot_cycle():
+    # A conflicting table where inserting 'b' leads back to the same stack on 'a'
+    firsts = {"S": {"a", "b", "ε"}, "A": {"a", "b", "ε"}, "B": {"a", "ε"}}
+    follows = {"S": {"a", "b", "$"}, "A": {"a", "b", "$"}, "B": {"a", "b", "$"}}
+    rules = {"S": [["S", "S", "a"], ["b", "B", "A"], ["A"]],
+             "A": [["ε"], ["ε"], ["B", "b", "S"]],
+             "B": [["ε"], ["a", "b"], ["ε"]]}
+    table = LL1Table(firsts, follows, ["S", "A", "B"], ["a", "b"], rules)
+    _, errors = table.parse_with_recovery(["a"])
+    assert errors[0]["Recovery"].endswith("Skipped 1 token(s) to break a recovery loop")
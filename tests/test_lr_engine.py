@@ -0,0 +1,9 @@
+from utils.glr import GLRParser
+from utils.grammar import Grammar
+from utils.lr_engine import build_lr1_table
+
+def test_canonical_lr1_explores_every_new_state():
+    # A state first reached with no lookaheads used to be created but never explored
+    g = Grammar.from_text("S -> B\nA -> ε | A S C\nB -> A | a B B | C a\nC -> C")
+    table = build_lr1_table(g, merge=False)
+    assert GLRParser(table).parse(["a", "a"]).accepted
@@ -0,0 +1,28 @@
+from utils.grammar import Grammar
+from utils.reduction import ReductionSearch
+
+EXPR = Grammar.from_text("E -> E + T | T\nT -> T * F | F\nF -> ( E ) | id")
+
+def replay(grammar, tokens, steps):
+    # Each reduction replaces a handle with only terminals to its right (a reverse RMD step)
+    form = list(tokens)
+    for (shown, (lhs, rhs)), (nxt, _) in zip(steps, steps[1:]):
+        assert shown == form
+        starts = [i for i in range(len(form) - len(rhs) + 1)
+                  if tuple(form[i:i + len(rhs)]) == rhs and not any(map(grammar.is_nonterminal, form[i + len(rhs):]))]
+        assert any(form[:i] + [lhs] + form[i + len(rhs):] == nxt for i in starts)
+        form = nxt
+    assert steps[-1] == ([grammar.start], None)
+
+def test_reductions_replay_a_rightmost_derivation():
+    tokens = "id + id * ( id + id )".split()
+    steps = ReductionSearch(EXPR).solve(tokens)
+    replay(EXPR, tokens, steps)
+    # One reduction per interior node of the only parse tree
+    assert len(steps) - 1 == 14
+
+def test_ambiguous_grammar_and_rejected_input():
+    grammar = Grammar.from_text("E -> E + E | E * E | id")
+    tokens = "id + id * id + id".split()
+    replay(grammar, tokens, ReductionSearch(grammar).solve(tokens))
+    assert ReductionSearch(EXPR).solve("id + * id".split()) is None
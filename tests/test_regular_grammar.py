@@ -0,0 +1,39 @@
+from itertools import product
+
+import pytest
+
+from utils.earley import EarleyParser
+from utils.grammar import Grammar
+from utils.regular_grammar import LEFT_LINEAR, RIGHT_LINEAR, classify_linear, grammar_to_nfa, nfa_accepts, to_lab_nfa
+
+# Strings over {a, b} ending in "a b", written both ways, plus ε-rules and multi-terminal bodies
+RIGHT = Grammar.from_text("S -> a S | b S | a b | a b A\nA -> ε")
+LEFT = Grammar.from_text("S -> A a b\nA -> A a | A b | ε")
+
+def strings(max_length):
+    for n in range(max_length + 1):
+        yield from (list(w) for w in product("ab", repeat=n))
+
+def test_classify_linear():
+    assert classify_linear(RIGHT) == (RIGHT_LINEAR, None)
+    assert classify_linear(LEFT) == (LEFT_LINEAR, None)
+    kind, reason = classify_linear(Grammar.from_text("S -> a S b | ε"))
+    assert kind is None and reason
+    kind, reason = classify_linear(Grammar.from_text("S -> a A | B a\nA -> a\nB -> b"))
+    assert kind is None and "not right-linear" in reason
+
+def test_nfa_accepts_the_grammar_language():
+    for grammar in (RIGHT, LEFT):
+        nfa, earley = grammar_to_nfa(grammar), EarleyParser(grammar)
+        for w in strings(6):
+            assert nfa_accepts(nfa, w) == earley.recognize(w), w
+
+def test_non_linear_grammar_is_rejected():
+    with pytest.raises(ValueError):
+        grammar_to_nfa(Grammar.from_text("S -> a S b | ε"))
+
+def test_lab_nfa_has_one_start_and_one_final_state():
+    lab = to_lab_nfa(grammar_to_nfa(RIGHT))
+    assert sum(n["isStart"] for n in lab["nodes"]) == 1
+    assert sum(n["isFinal"] for n in lab["nodes"]) == 1
+    assert len({n["label"] for n in lab["nodes"]}) == len(lab["nodes"])
@@ -0,0 +1,43 @@
+from collections import Counter
+
+import pytest
+
+from utils.earley import EarleyParser
+from utils.grammar import Grammar
+from utils.sentence_gen import SentenceGenerator
+
+CATALAN = [1, 1, 2, 5, 14, 42, 132]
+SUMS = Grammar.from_text("E -> E + E | a")
+
+def test_counts_are_catalan_numbers():
+    gen = SentenceGenerator(SUMS, max_length=13)
+    assert [gen.count(2 * k + 1) for k in range(len(CATALAN))] == CATALAN
+    assert gen.count(4) == 0 and gen.sample(4) is None
+    assert gen.lengths() == list(range(1, 14, 2))
+    with pytest.raises(ValueError):
+        gen.count(14)
+
+def test_samples_are_in_the_language():
+    # ε- and unit rules are normalized away first
+    grammar = Grammar.from_text("S -> ( S ) S | T\nT -> x | ε")
+    gen, earley = SentenceGenerator(grammar, seed=1), EarleyParser(grammar)
+    for n in gen.lengths()[:12]:
+        for tokens in gen.sentences(n, 20):
+            assert len(tokens) == n and earley.recognize(tokens)
+
+def test_sentences_are_uniform():
+    # Unambiguous: the 2³ = 8 strings of length 4 over {a, b} ending in 'a'
+    gen = SentenceGenerator(Grammar.from_text("S -> a S | b S | a"), seed=7)
+    seen = Counter(" ".join(tokens) for tokens in gen.sentences(4, 8000))
+    assert len(seen) == 8
+    assert all(800 <= k <= 1200 for k in seen.values())
+
+def test_write_streams_one_sentence_per_line(tmp_path):
+    path = tmp_path / "corpus.txt"
+    assert SentenceGenerator(SUMS, seed=3).write(path, 7, 25) == 25
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 25 and all(len(line.split()) == 7 for line in lines)
+
+def test_sample_nested_deeper_than_the_recursion_limit():
+    gen = SentenceGenerator(Grammar.from_text("S -> ( S ) | x"), max_length=2001, seed=1)
+    assert gen.sample(2001) == ["("] * 1000 + ["x"] + [")"] * 1000
@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 32
+
+class BuildCache:
+    """Least-recently-used cache of built tables, parsers and tokenizers.
+
+    Keys are hashable identities of what was built, usually derived from
+    `Grammar.key()`. Once `maxsize` entries are held, the entry used least
+    recently is dropped to make room for a new one.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key, build):
+        """Return the entry for `key`, calling `build()` to create it on a miss."""
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            return entries[key]
+        value = entries[key] = build()
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,176 @@
+from collections import deque
+
+from utils.grammar import Grammar
+from utils.grammar_transforms import fresh_name
+
+def to_cnf(grammar):
+    """Convert `grammar` to Chomsky Normal Form (START, TERM, BIN, DEL, UNIT).
+
+    Every rule of the result is `A -> B C` or `A -> a`, plus `S0 -> ε` when
+    the language contains the empty string. The new start symbol never
+    appears on a right-hand side. Returns a `Grammar`.
+    """
+    taken = set(grammar.nonterminals) | set(grammar.terminals)
+    nts = set(grammar.nonterminals)
+
+    # START: a fresh start symbol that no RHS mentions
+    start = fresh_name(f"{grammar.start}0", taken)
+    nts.add(start)
+    rules = [(start, (grammar.start,))] + list(grammar.productions)
+
+    # TERM: terminals inside long bodies get their own non-terminal
+    term_nt = {}
+    termed = []
+    for lhs, rhs in rules:
+        if len(rhs) >= 2:
+            body = []
+            for sym in rhs:
+                if sym not in nts:
+                    if sym not in term_nt:
+                        term_nt[sym] = fresh_name(f"T_{sym}", taken)
+                    sym = term_nt[sym]
+                body.append(sym)
+            rhs = tuple(body)
+        termed.append((lhs, rhs))
+    for a, nt in term_nt.items():
+        nts.add(nt)
+        termed.append((nt, (a,)))
+
+    # BIN: split bodies longer than two into a right-branching chain
+    binary = []
+    for lhs, rhs in termed:
+        while len(rhs) > 2:
+            rest = fresh_name(f"{lhs}_{len(binary)}", taken)
+            nts.add(rest)
+            binary.append((lhs, (rhs[0], rest)))
+            lhs, rhs = rest, rhs[1:]
+        binary.append((lhs, rhs))
+
+    # DEL: nullable non-terminals by worklist, then add the ε-free variants
+    uses = {}
+    remaining = []
+    nullable = set()
+    work = deque()
+    for k, (lhs, rhs) in enumerate(binary):
+        remaining.append(len(rhs))
+        for sym in rhs:
+            uses.setdefault(sym, []).append(k)
+        if not rhs and lhs not in nullable:
+            nullable.add(lhs)
+            work.append(lhs)
+    while work:
+        sym = work.popleft()
+        for k in uses.get(sym, ()):
+            remaining[k] -= 1
+            lhs = binary[k][0]
+            if remaining[k] == 0 and lhs not in nullable:
+                nullable.add(lhs)
+                work.append(lhs)
+    expanded = set()
+    for lhs, rhs in binary:
+        if len(rhs) == 2:
+            b, c = rhs
+            if b in nullable:
+                expanded.add((lhs, (c,)))
+            if c in nullable:
+                expanded.add((lhs, (b,)))
+        if rhs:
+            expanded.add((lhs, rhs))
+
+    # UNIT: replace A -> B chains by the non-unit rules reachable from A
+    unit_of = {}
+    proper = {}
+    for lhs, rhs in expanded:
+        if len(rhs) == 1 and rhs[0] in nts:
+            unit_of.setdefault(lhs, set()).add(rhs[0])
+        else:
+            proper.setdefault(lhs, set()).add(rhs)
+    productions = []
+    if grammar.start in nullable:
+        productions.append((start, ()))
+    order = [start] + [nt for nt in grammar.nonterminals] + sorted(nts - set(grammar.nonterminals) - {start})
+    for a in order:
+        reach, work = {a}, deque([a])
+        while work:
+            for b in unit_of.get(work.popleft(), ()):
+                if b not in reach:
+                    reach.add(b)
+                    work.append(b)
+        bodies = set()
+        for b in reach:
+            bodies |= proper.get(b, set())
+        productions += [(a, rhs) for rhs in sorted(bodies)]
+
+    # Drop bodies that use a non-terminal left with no rules (e.g. one that
+    # only derived ε), so no non-terminal is mistaken for a terminal
+    while True:
+        defined = {lhs for lhs, _ in productions}
+        kept = [(lhs, rhs) for lhs, rhs in productions if all(sym in defined or sym not in nts for sym in rhs)]
+        if len(kept) == len(productions):
+            break
+        productions = kept
+    return Grammar(productions, start=start)
+
+
+class CYKParser:
+    """CYK membership test over the CNF form of a grammar.
+
+    Chart cells are Python ints used as bitsets of non-terminals, so a cell
+    is combined from a split point with one AND per binary-rule group.
+    """
+
+    def __init__(self, grammar):
+        self.cnf = cnf = to_cnf(grammar)
+        self.nt_index = {nt: k for k, nt in enumerate(cnf.nonterminals)}
+        # The start symbol has no rules at all when the language is empty
+        self.start_bit = 1 << self.nt_index[cnf.start] if cnf.start in self.nt_index else 0
+        self.accepts_empty = False
+        self.term_bits = {}
+        pairs = {}
+        for lhs, rhs in cnf.productions:
+            bit = 1 << self.nt_index[lhs]
+            if not rhs:
+                self.accepts_empty = True
+            elif len(rhs) == 1:
+                self.term_bits[rhs[0]] = self.term_bits.get(rhs[0], 0) | bit
+            else:
+                key = (self.nt_index[rhs[0]], self.nt_index[rhs[1]])
+                pairs[key] = pairs.get(key, 0) | bit
+        # by_left[B] -> [(bit of C, bits of every A with A -> B C)]
+        self.by_left = [[] for _ in cnf.nonterminals]
+        for (b, c), heads in sorted(pairs.items()):
+            self.by_left[b].append((1 << c, heads))
+
+    def chart(self, tokens):
+        """Fill the CYK table; `chart[i][j]` is the bitset of non-terminals deriving tokens[i:j]."""
+        tokens = list(tokens)
+        n = len(tokens)
+        by_left = self.by_left
+        chart = [[0] * (n + 1) for _ in range(n + 1)]
+        for i, tok in enumerate(tokens):
+            chart[i][i + 1] = self.term_bits.get(tok, 0)
+        for length in range(2, n + 1):
+            for i in range(n - length + 1):
+                j = i + length
+                row = chart[i]
+                cell = 0
+                for k in range(i + 1, j):
+                    left = row[k]
+                    right = chart[k][j] if left else 0
+                    while left and right:
+                        low = left & -left
+                        left ^= low
+                        for c_bit, heads in by_left[low.bit_length() - 1]:
+                            if right & c_bit:
+                                cell |= heads
+                row[j] = cell
+        return chart
+
+    def recognize(self, tokens):
+        tokens = list(tokens)
+        if not tokens:
+            return self.accepts_empty
+        return bool(self.chart(tokens)[0][len(tokens)] & self.start_bit)
+
+    def cell_symbols(self, bits):
+        return [nt for nt, k in self.nt_index.items() if bits >> k & 1]
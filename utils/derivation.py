@@ -0,0 +1,182 @@
+import math
+from collections import deque
+
+from utils.search import SearchStore, bidirectional_search
+
+# A sentential form may run this many symbols past the target's length
+# (room for symbols that later derive ε)
+MAX_EXTRA_SYMBOLS = 15
+DEFAULT_MAX_STATES = 200000
+
+class DerivationEngine:
+    """Breadth-first LMD/RMD search over token-ID sentential forms.
+
+    Symbols are interned to ints, non-terminals first. A form is a cons
+    list `(symbol, rest)` read from the end being expanded: left to right
+    for LMD, right to left for RMD. Terminals reaching that end are matched
+    against the target at once and folded into a counter. The head is
+    therefore always the non-terminal to expand, and each step costs
+    O(|rhs|).
+
+    Forms are pruned when a terminal cannot match the target, or when the
+    shortest terminal string the remaining symbols can derive is too long.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.symbols = list(grammar.nonterminals) + list(grammar.terminals)
+        self.ids = {sym: k for k, sym in enumerate(self.symbols)}
+        self.n_nts = len(grammar.nonterminals)
+        self.start_id = self.ids.get(grammar.start)
+        self.rhs_of = [[] for _ in range(self.n_nts)]
+        for lhs, rhs in grammar.productions:
+            self.rhs_of[self.ids[lhs]].append(tuple(self.ids[s] for s in rhs))
+
+        # Shortest terminal yield of every symbol (inf if unproductive)
+        self.min_len = [math.inf] * self.n_nts + [1] * len(grammar.terminals)
+        changed = True
+        while changed:
+            changed = False
+            for a, bodies in enumerate(self.rhs_of):
+                for body in bodies:
+                    size = sum(self.min_len[s] for s in body)
+                    if size < self.min_len[a]:
+                        self.min_len[a] = size
+                        changed = True
+
+    def shortest_derivations(self, target, mode="LMD", max_states=DEFAULT_MAX_STATES):
+        """Lazily yield every shortest `mode` derivation of the token list `target`.
+
+        Each derivation is a list of sentential forms (symbol lists), from the
+        start symbol to `target`. A path is yielded as soon as the BFS pops
+        its final form, so the first result does not wait for the others.
+        Nothing is yielded if no derivation is found within `max_states`
+        queued forms.
+        """
+        if self.start_id is None or any(t not in self.ids or self.ids[t] < self.n_nts for t in target):
+            return
+        leftmost = mode == "LMD"
+        n = len(target)
+        # Target ids in the order they are matched
+        goal = [self.ids[t] for t in (target if leftmost else reversed(target))]
+        n_nts, min_len, rhs_of = self.n_nts, self.min_len, self.rhs_of
+        max_len = n + MAX_EXTRA_SYMBOLS
+
+        store = SearchStore()
+        # State: (matched, form, form length, shortest yield of form)
+        root = (0, (self.start_id, None), 1, min_len[self.start_id])
+        queue = deque([store.add(root)])
+        depth_of = {root[:2]: 0}
+        solution_depth = None
+        yielded = set()
+
+        while queue and len(store) < max_states:
+            node = queue.popleft()
+            k, form, size, need = store.states[node]
+            depth = store.depth[node]
+            if solution_depth is not None and depth > solution_depth:
+                break
+            if form is None:
+                if k == n:
+                    solution_depth = depth
+                    path = tuple(store.states_on_path(node))
+                    if path not in yielded:
+                        yielded.add(path)
+                        yield [self._form(state, target, leftmost) for state in path]
+                continue
+            if solution_depth is not None:
+                continue
+            a, tail = form
+            for body in rhs_of[a]:
+                new_need = need - min_len[a] + sum(min_len[s] for s in body)
+                if k + new_need > n:
+                    continue
+                new_form = tail
+                for s in (reversed(body) if leftmost else body):
+                    new_form = (s, new_form)
+                new_k, new_size = k, size - 1 + len(body)
+                # Match terminals that reached the expanding end
+                while new_form is not None and new_form[0] >= n_nts:
+                    if new_k == n or new_form[0] != goal[new_k]:
+                        break
+                    new_k += 1
+                    new_size -= 1
+                    new_need -= 1
+                    new_form = new_form[1]
+                else:
+                    if new_k + new_size > max_len:
+                        continue
+                    key = (new_k, new_form)
+                    seen = depth_of.get(key)
+                    if seen is None or seen == depth + 1:
+                        depth_of[key] = depth + 1
+                        queue.append(store.add((new_k, new_form, new_size, new_need), node))
+
+    def bidirectional_derivation(self, target, mode="LMD", max_states=DEFAULT_MAX_STATES):
+        """One shortest `mode` derivation of `target`, found by meet-in-the-middle.
+
+        Forward moves expand the leftmost/rightmost non-terminal of the start
+        symbol's forms. Backward moves undo such a step on forms reached from
+        the target: a reduction whose new non-terminal is leftmost/rightmost.
+        Forms are flat id tuples here, since both ends get rewritten. Returns
+        a list of sentential forms, or None.
+        """
+        if self.start_id is None or any(t not in self.ids or self.ids[t] < self.n_nts for t in target):
+            return None
+        leftmost = mode == "LMD"
+        goal = tuple(self.ids[t] for t in target)
+        n = len(goal)
+        n_nts, min_len, rhs_of = self.n_nts, self.min_len, self.rhs_of
+        max_len = n + MAX_EXTRA_SYMBOLS
+        bodies = [(a, body) for a, alts in enumerate(rhs_of) for body in alts]
+
+        def nt_positions(form):
+            return [i for i, s in enumerate(form) if s < n_nts]
+
+        def forward(form):
+            nts = nt_positions(form)
+            if not nts:
+                return
+            i = nts[0] if leftmost else nts[-1]
+            for body in rhs_of[form[i]]:
+                new = form[:i] + body + form[i + 1:]
+                if len(new) > max_len or sum(min_len[s] for s in new) > n:
+                    continue
+                # Terminals already fixed at the expanding end must match the target
+                cut = next((j for j, s in enumerate(new) if s < n_nts), len(new)) if leftmost else \
+                    next((j for j in range(len(new) - 1, -1, -1) if new[j] < n_nts), -1)
+                if leftmost and new[:cut] != goal[:cut]:
+                    continue
+                if not leftmost and new[cut + 1:] != goal[n - (len(new) - cut - 1):]:
+                    continue
+                yield new, None
+
+        def backward(form):
+            nts = nt_positions(form)
+            for a, body in bodies:
+                size = len(body)
+                if leftmost:
+                    starts = range(0, (nts[0] if nts else len(form)) + 1)
+                else:
+                    starts = range(max(0, (nts[-1] + 1 if nts else 0) - size), len(form) - size + 1)
+                for j in starts:
+                    if j + size <= len(form) and form[j:j + size] == body:
+                        new = form[:j] + (a,) + form[j + size:]
+                        if len(new) <= max_len:
+                            yield new, None
+
+        steps = bidirectional_search((self.start_id,), goal, forward, backward, max_states)
+        if steps is None:
+            return None
+        return [[self.symbols[s] for s in form] for form, _ in steps]
+
+    def _form(self, state, target, leftmost):
+        # Rebuild the full sentential form: matched terminals plus the cons list
+        k, form, _, _ = state
+        rest = []
+        while form is not None:
+            rest.append(self.symbols[form[0]])
+            form = form[1]
+        if leftmost:
+            return list(target[:k]) + rest
+        return rest[::-1] + list(target[len(target) - k:])
@@ -0,0 +1,223 @@
+import math
+
+class EarleyParser:
+    """Earley parser for an arbitrary context-free grammar.
+
+    Handles ambiguous, left-recursive and ε-rules (nullable symbols use the
+    Aycock-Horspool prediction fix). Worst case is O(n³); most practical
+    grammars run in linear time. Items are ints `item_base[p] + dot`, as in
+    `utils.lr_engine`, and each Earley set maps `(item, origin)` to the
+    back-pointers that produced it, so the chart doubles as a shared packed
+    parse forest.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.nullable = grammar.nullable()
+        self.item_base = []
+        self.item_prod = []
+        self.item_next = []
+        for p, (_, rhs) in enumerate(grammar.productions):
+            self.item_base.append(len(self.item_prod))
+            for dot in range(len(rhs) + 1):
+                self.item_prod.append(p)
+                self.item_next.append(rhs[dot] if dot < len(rhs) else None)
+
+    def end_item(self, p):
+        return self.item_base[p] + len(self.grammar.productions[p][1])
+
+    def parse(self, tokens):
+        """Build the chart for `tokens` and return it as a `ParseForest`."""
+        tokens = list(tokens)
+        n = len(tokens)
+        g = self.grammar
+        prods_of, nullable = g.prods_of, self.nullable
+        item_base, item_prod, item_next = self.item_base, self.item_prod, self.item_next
+
+        # sets[j][(item, origin)] -> {(k, child): None}; the predecessor item
+        # (item - 1, origin) lives in set k and `child` is the non-terminal
+        # completed over k..j, or None for the token at k
+        sets = [{} for _ in range(n + 1)]
+        orders = [[] for _ in range(n + 1)]
+        waiting = [{} for _ in range(n + 1)]
+
+        def add(j, key, link):
+            links = sets[j].get(key)
+            if links is None:
+                links = sets[j][key] = {}
+                orders[j].append(key)
+            if link is not None:
+                links[link] = None
+
+        if g.start is not None:
+            for p in prods_of[g.start]:
+                add(0, (item_base[p], 0), None)
+
+        for j in range(n + 1):
+            order = orders[j]
+            predicted = set()
+            tok = tokens[j] if j < n else None
+            i = 0
+            while i < len(order):
+                it, origin = order[i]
+                i += 1
+                sym = item_next[it]
+                if sym is None:
+                    lhs = g.productions[item_prod[it]][0]
+                    for it2, o2 in list(waiting[origin].get(lhs, ())):
+                        add(j, (it2 + 1, o2), (origin, lhs))
+                elif sym in prods_of:
+                    waiting[j].setdefault(sym, []).append((it, origin))
+                    if sym not in predicted:
+                        predicted.add(sym)
+                        for p in prods_of[sym]:
+                            add(j, (item_base[p], j), None)
+                    if sym in nullable:
+                        add(j, (it + 1, origin), (j, sym))
+                elif sym == tok:
+                    add(j + 1, (it + 1, origin), (j, None))
+        return ParseForest(self, tokens, sets)
+
+    def recognize(self, tokens):
+        return self.parse(tokens).accepted
+
+
+class ParseForest:
+    """The completed Earley chart, read as a shared packed parse forest.
+
+    A symbol node `(X, i, j)` packs every production of X completed over
+    tokens i..j; each item back-pointer is one binarised family. Trees are
+    `(lhs, production, children)` tuples whose children are sub-trees or
+    token strings, and are only built when `trees()` is iterated.
+    """
+
+    def __init__(self, parser, tokens, sets):
+        self.parser = parser
+        self.grammar = parser.grammar
+        self.tokens = tokens
+        self.sets = sets
+        self.accepted = self.grammar.start is not None and self._has_span(self.grammar.start, 0, len(tokens))
+
+    def _completions(self, sym, i, j):
+        parser, chart = self.parser, self.sets[j]
+        return [p for p in self.grammar.prods_of.get(sym, ()) if (parser.end_item(p), i) in chart]
+
+    def _has_span(self, sym, i, j):
+        return bool(self._completions(sym, i, j))
+
+    def count_trees(self):
+        """Exact number of parse trees, by dynamic programming over the forest.
+
+        Counts are Python ints, so they never overflow. Every node in the
+        chart has at least one derivation, so a cycle reachable from the root
+        (A ⇒+ A over one span) means infinitely many trees: `math.inf`.
+        """
+        if not self.accepted:
+            return 0
+        parser, sets = self.parser, self.sets
+        counts = {}
+        active = set()
+        stack = [(("sym", self.grammar.start, 0, len(self.tokens)), False)]
+        while stack:
+            node, done = stack.pop()
+            kind, a, i, j = node
+            if done:
+                active.discard(node)
+                if kind == "sym":
+                    counts[node] = sum(counts[("item", parser.end_item(p), i, j)] for p in self._completions(a, i, j))
+                elif a == parser.item_base[parser.item_prod[a]]:
+                    counts[node] = 1
+                else:
+                    counts[node] = sum(counts[("item", a - 1, i, k)] * (counts[("sym", child, k, j)] if child else 1)
+                                       for k, child in sets[j][(a, i)])
+                continue
+            if node in counts:
+                continue
+            if node in active:
+                return math.inf
+            active.add(node)
+            stack.append((node, True))
+            if kind == "sym":
+                stack.extend((("item", parser.end_item(p), i, j), False) for p in self._completions(a, i, j))
+            elif a != parser.item_base[parser.item_prod[a]]:
+                for k, child in sets[j][(a, i)]:
+                    stack.append((("item", a - 1, i, k), False))
+                    if child is not None:
+                        stack.append((("sym", child, k, j), False))
+        return counts[("sym", self.grammar.start, 0, len(self.tokens))]
+
+    def trees(self):
+        """Lazily yield every distinct parse tree of the input.
+
+        A non-terminal that derives itself over the same span (A -> A, or
+        ε-cycles) would give infinitely many trees; such cycles are cut, so
+        only trees without a repeated `(symbol, span)` on one branch appear.
+        """
+        if not self.accepted:
+            return iter(())
+        return self._trees()
+
+    def _trees(self):
+        # Depth-first search over the forest with an explicit stack, so deep
+        # trees need no Python recursion. A search state is a pair of linked
+        # lists `(head, tail)`: the goals still to expand, and the finished
+        # values (sub-trees and tokens) on top of which the next ones go.
+        # Alternatives are pushed in reverse, so trees come out in the same
+        # order as nested loops over productions, splits and sub-trees.
+        parser, sets, tokens = self.parser, self.sets, self.tokens
+        item_base, item_prod = parser.item_base, parser.item_prod
+        stack = [((("sym", self.grammar.start, 0, len(tokens), frozenset()), None), None)]
+        while stack:
+            goals, values = stack.pop()
+            if goals is None:
+                yield values[0]
+                continue
+            goal, goals = goals
+            kind = goal[0]
+            if kind == "sym":
+                # One alternative per production of X completed over i..j
+                _, sym, i, j, ancestors = goal
+                node = (sym, i, j)
+                if node in ancestors:
+                    continue
+                ancestors = ancestors | {node}
+                alts = []
+                for p in self._completions(sym, i, j):
+                    end = parser.end_item(p)
+                    build = ("build", sym, p, end - item_base[p])
+                    alts.append(((("seq", end, i, j, ancestors), (build, goals)), values))
+                stack.extend(reversed(alts))
+            elif kind == "seq":
+                # Children of the RHS prefix before item `it`, spanning origin..j
+                _, it, origin, j, ancestors = goal
+                if it == item_base[item_prod[it]]:
+                    if origin == j:
+                        stack.append((goals, values))
+                    continue
+                alts = []
+                for k, child in sets[j][(it, origin)]:
+                    last = ("token", tokens[k]) if child is None else ("sym", child, k, j, ancestors)
+                    alts.append(((("seq", it - 1, origin, k, ancestors), (last, goals)), values))
+                stack.extend(reversed(alts))
+            elif kind == "token":
+                stack.append((goals, (goal[1], values)))
+            else:
+                # All n children are done: fold them into one tree
+                _, sym, p, n = goal
+                children = [None] * n
+                for m in range(n - 1, -1, -1):
+                    children[m], values = values
+                stack.append((goals, ((sym, p, tuple(children)), values)))
+
+
+def tree_derivation(tree, leftmost=True):
+    """Sentential forms (symbol lists) of the LMD or RMD that builds `tree`."""
+    frontier = [tree]
+    forms = [[tree[0]]]
+    while True:
+        open_nodes = [k for k, node in enumerate(frontier) if isinstance(node, tuple)]
+        if not open_nodes:
+            return forms
+        k = open_nodes[0] if leftmost else open_nodes[-1]
+        frontier[k:k + 1] = list(frontier[k][2])
+        forms.append([node[0] if isinstance(node, tuple) else node for node in frontier])
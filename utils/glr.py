@@ -0,0 +1,235 @@
+import math
+
+from utils.grammar import END_MARKER
+from utils.lr_engine import SHIFT, REDUCE, ACCEPT
+
+class _StackNode:
+    """One vertex of the graph-structured stack: an LR state at an input position."""
+    __slots__ = ("state", "level", "edges")
+
+    def __init__(self, state, level):
+        self.state = state
+        self.level = level
+        # predecessor vertex -> forest node key of the symbol on that edge
+        self.edges = {}
+
+class GLRParser:
+    """Tomita-style generalised LR parser over an `LRTable`.
+
+    Conflicting cells in `table.all_actions` fork the parse. Forks share a
+    graph-structured stack: one vertex per (state, position), so stacks
+    that reach the same state merge. On a conflict-free table this is a
+    plain LR parse plus bookkeeping. Reductions build a shared packed forest
+    keyed by `(symbol, start, end)`.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.grammar = table.grammar
+
+    def parse(self, tokens):
+        """Parse `tokens`; returns a `GLRForest` (check `.accepted` / `.error`)."""
+        toks = list(tokens) + [END_MARKER]
+        actions = self.table.all_actions
+        families = {}
+        level = {0: _StackNode(0, 0)}
+        root, error = None, None
+
+        for i, a in enumerate(toks):
+            self._reduce_all(level, i, a, families)
+            if a == END_MARKER:
+                for node in level.values():
+                    if any(kind == ACCEPT for kind, _ in actions[node.state].get(a, ())):
+                        for below, key in node.edges.items():
+                            if below.state == 0:
+                                root = key
+                break
+            shifted = {}
+            for node in level.values():
+                for kind, target in actions[node.state].get(a, ()):
+                    if kind == SHIFT:
+                        if target not in shifted:
+                            shifted[target] = _StackNode(target, i + 1)
+                        shifted[target].edges[node] = (a, i, i + 1)
+            if not shifted:
+                expected = sorted({t for node in level.values() for t in actions[node.state]})
+                error = f"Syntax Error: Unexpected '{a}' (expected one of: {', '.join(expected)})."
+                break
+            level = shifted
+
+        if root is None and error is None:
+            error = "Syntax Error: Unexpected end of input."
+        return GLRForest(self.grammar, toks[:-1], families, root, error)
+
+    def _reduce_all(self, level, i, a, families):
+        """Apply every reduction on lookahead `a` at position `i`, to a fixpoint.
+
+        Vertices created here are appended to `order` and processed in the
+        same sweep. A new edge on an already-processed vertex opens paths it
+        has not reduced through yet (Farshi's fix), so the sweep repeats.
+        """
+        prods = self.grammar.productions
+        actions, goto = self.table.all_actions, self.table.goto
+        order = list(level.values())
+        position = {node: k for k, node in enumerate(order)}
+        changed = True
+        while changed:
+            changed = False
+            k = 0
+            while k < len(order):
+                node = order[k]
+                for kind, p in actions[node.state].get(a, ()):
+                    if kind != REDUCE:
+                        continue
+                    lhs, rhs = prods[p]
+                    for below, labels in list(self._paths(node, len(rhs))):
+                        key = (lhs, below.level, i)
+                        families.setdefault(key, {})[(p, labels)] = None
+                        state = goto[below.state][lhs]
+                        top = level.get(state)
+                        if top is None:
+                            top = level[state] = _StackNode(state, i)
+                            position[top] = len(order)
+                            order.append(top)
+                        if below not in top.edges:
+                            top.edges[below] = key
+                            if position[top] <= k:
+                                changed = True
+                k += 1
+
+    def _paths(self, node, length):
+        # (bottom vertex, edge labels left to right) for every path of `length` edges
+        if length == 0:
+            yield node, ()
+            return
+        for below, key in node.edges.items():
+            for bottom, labels in self._paths(below, length - 1):
+                yield bottom, labels + (key,)
+
+    def recognize(self, tokens):
+        return self.parse(tokens).accepted
+
+
+class GLRForest:
+    """Shared packed parse forest produced by `GLRParser`.
+
+    `families[(X, i, j)]` holds the `(production, child keys)` ways X spans
+    tokens i..j; keys without families are token leaves. Trees use the
+    `(lhs, production, children)` shape of `utils.earley`.
+    """
+
+    def __init__(self, grammar, tokens, families, root, error):
+        self.grammar = grammar
+        self.tokens = tokens
+        self.families = families
+        self.root = root
+        self.error = error
+        self.accepted = root is not None
+
+    def trees(self):
+        """Lazily yield every parse tree, cutting `A ⇒+ A` cycles."""
+        if not self.accepted:
+            return iter(())
+        return self._trees()
+
+    def _trees(self):
+        # Depth-first search with an explicit stack (no recursion on deep
+        # trees): a state is the linked list of goals still to expand and the
+        # linked list of finished children, as in `utils.earley`.
+        families = self.families
+        stack = [((("node", self.root, frozenset()), None), None)]
+        while stack:
+            goals, values = stack.pop()
+            if goals is None:
+                yield values[0]
+                continue
+            goal, goals = goals
+            if goal[0] == "build":
+                _, sym, p, n = goal
+                children = [None] * n
+                for m in range(n - 1, -1, -1):
+                    children[m], values = values
+                stack.append((goals, ((sym, p, tuple(children)), values)))
+                continue
+            _, key, ancestors = goal
+            if key not in families:
+                # Token leaf
+                stack.append((goals, (key[0], values)))
+                continue
+            if key in ancestors:
+                continue
+            ancestors = ancestors | {key}
+            alts = []
+            for p, kids in families[key]:
+                rest = (("build", key[0], p, len(kids)), goals)
+                for kid in reversed(kids):
+                    rest = (("node", kid, ancestors), rest)
+                alts.append((rest, values))
+            stack.extend(reversed(alts))
+
+    def count_trees(self):
+        """Exact number of parse trees (`math.inf` if a cycle is reachable)."""
+        if not self.accepted:
+            return 0
+        families = self.families
+        counts = {}
+        active = set()
+        stack = [(self.root, False)]
+        while stack:
+            key, done = stack.pop()
+            if done:
+                active.discard(key)
+                total = 0
+                for _, kids in families[key]:
+                    prod = 1
+                    for kid in kids:
+                        prod *= counts.get(kid, 1)
+                    total += prod
+                counts[key] = total
+                continue
+            if key in counts:
+                continue
+            if key in active:
+                return math.inf
+            active.add(key)
+            stack.append((key, True))
+            for _, kids in families[key]:
+                stack.extend((kid, False) for kid in kids if kid in families)
+        return counts[self.root]
+
+
+def shift_reduce_trace(tree, tokens):
+    """Replay a parse tree as the shift/reduce moves of an LR parser.
+
+    Rows use the Stack/Input/Action format of `LRTable.parse`, so a GLR
+    result can be shown in the same trace table.
+    """
+    toks = list(tokens) + [END_MARKER]
+    stack = [END_MARKER]
+    rows = []
+    pos = 0
+
+    def log(action):
+        rows.append({"Stack": " ".join(stack), "Input": " ".join(toks[pos:]), "Action": action})
+
+    work = [(tree, 0)]
+    while work:
+        node, k = work.pop()
+        lhs, _, children = node
+        if k < len(children):
+            work.append((node, k + 1))
+            child = children[k]
+            if isinstance(child, tuple):
+                work.append((child, 0))
+            else:
+                log(f"Shift {child}")
+                stack.append(child)
+                pos += 1
+        else:
+            rhs = [c[0] if isinstance(c, tuple) else c for c in children]
+            log(f"Reduce: Handle = {' '.join(rhs) if rhs else 'ε'} --> {lhs}")
+            if rhs:
+                del stack[-len(rhs):]
+            stack.append(lhs)
+    log("Accept")
+    return rows
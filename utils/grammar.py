@@ -0,0 +1,235 @@
+import re
+
+EPSILON_SYMBOLS = ("ε", "e", "lambda")
+END_MARKER = "$"
+SYMBOL_RE = re.compile(r"[a-zA-Z0-9]+'|[a-zA-Z0-9]+|[^a-zA-Z0-9\s]")
+ASSOCIATIVITIES = {"%left": "left", "%right": "right", "%nonassoc": "nonassoc"}
+DECL_SYMBOL_RE = re.compile(r"'([^']+)'|\"([^\"]+)\"|(\S+)")
+
+def tokenize_symbols(text):
+    """Split an RHS alternative into grammar symbols (words, primed names like E', or single special characters)."""
+    return SYMBOL_RE.findall(text)
+
+def split_sentential(text, nonterminals=()):
+    """Split a run-together sentential form ("aSa", "id+E'") into symbols.
+
+    Known non-terminals are matched longest-first and every other
+    non-space character is a terminal, which mirrors how the derivation
+    labs compare raw strings.
+    """
+    names = sorted((re.escape(nt) for nt in nonterminals), key=len, reverse=True)
+    return re.findall("|".join(names + [r"\S"]), text)
+
+def _decl_symbols(text):
+    # Symbols of a %left/%right/%nonassoc/%prec clause; quotes are optional ('+' or +)
+    return ["".join(groups) for groups in DECL_SYMBOL_RE.findall(text)]
+
+class Grammar:
+    """Context-free grammar shared by the parsing engines.
+
+    Productions are kept as an ordered list of `(lhs, rhs)` pairs with `rhs`
+    a tuple of symbols; an ε-production has an empty tuple. Non-terminals are
+    every LHS, in order of first appearance, and the first one is the start
+    symbol. Every other RHS symbol is a terminal.
+
+    `precedence` maps a terminal to `(level, assoc)` as declared with yacc's
+    `%left`/`%right`/`%nonassoc` (later lines bind tighter), and
+    `rule_precedence` maps a production index to its `%prec` symbol.
+    """
+
+    def __init__(self, productions, start=None, precedence=None, rule_precedence=None):
+        self.productions = [(lhs, tuple(rhs)) for lhs, rhs in productions]
+        self.precedence = dict(precedence or {})
+        self.rule_precedence = dict(rule_precedence or {})
+        self.nonterminals = []
+        self.prods_of = {}
+        for p, (lhs, _) in enumerate(self.productions):
+            if lhs not in self.prods_of:
+                self.prods_of[lhs] = []
+                self.nonterminals.append(lhs)
+            self.prods_of[lhs].append(p)
+        self.start = start if start is not None else (self.nonterminals[0] if self.nonterminals else None)
+
+        self.terminals = []
+        seen = set(self.nonterminals)
+        for _, rhs in self.productions:
+            for sym in rhs:
+                if sym not in seen:
+                    seen.add(sym)
+                    self.terminals.append(sym)
+
+        self._nullable = None
+        self._first = None
+        self._follow = None
+
+    @classmethod
+    def from_text(cls, text, tokenizer=tokenize_symbols):
+        """Parse `A -> x y | z` lines. An alternative that is only ε/e/lambda is an ε-production.
+
+        Lines such as `%left '+' '-'` declare operator precedence, lowest
+        first, and `E -> - E %prec UMINUS` gives one alternative the
+        precedence of another symbol.
+        """
+        productions = []
+        precedence = {}
+        rule_precedence = {}
+        for line in text.split("\n"):
+            decl, _, rest = line.strip().partition(" ")
+            if decl in ASSOCIATIVITIES:
+                level = len({lvl for lvl, _ in precedence.values()}) + 1
+                for sym in _decl_symbols(rest):
+                    precedence[sym] = (level, ASSOCIATIVITIES[decl])
+                continue
+            if "->" not in line:
+                continue
+            lhs, rhs_blob = line.split("->", 1)
+            lhs = lhs.strip()
+            for opt in rhs_blob.split("|"):
+                opt, has_prec, prec_sym = opt.partition("%prec")
+                if has_prec and _decl_symbols(prec_sym):
+                    rule_precedence[len(productions)] = _decl_symbols(prec_sym)[0]
+                tokens = tokenizer(opt)
+                if len(tokens) == 1 and tokens[0] in EPSILON_SYMBOLS:
+                    tokens = []
+                productions.append((lhs, tokens))
+        return cls(productions, precedence=precedence, rule_precedence=rule_precedence)
+
+    @classmethod
+    def from_string_rules(cls, text):
+        """Parse rules whose terminals are written run together (S -> aSa | (S)S | ε).
+
+        Non-terminals are the LHS names; RHS strings are split with
+        `split_sentential`, so each other character is a terminal.
+        """
+        lines = [line.split("->", 1) for line in text.split("\n") if "->" in line]
+        nonterminals = [lhs.strip() for lhs, _ in lines]
+        productions = []
+        for lhs, rhs_blob in lines:
+            for opt in rhs_blob.split("|"):
+                opt = opt.strip()
+                symbols = [] if opt in EPSILON_SYMBOLS else split_sentential(opt, nonterminals)
+                productions.append((lhs.strip(), symbols))
+        return cls(productions)
+
+    @classmethod
+    def from_mixed_text(cls, text):
+        """Parse rules whose alternatives are space-separated (A -> a B) or run together (A -> aB).
+
+        Run-together alternatives are split with `split_sentential`, so known
+        non-terminals match longest-first and every other character is a
+        terminal.
+        """
+        nonterminals = [line.split("->", 1)[0].strip() for line in text.split("\n") if "->" in line]
+        def split_alternative(opt):
+            opt = opt.strip()
+            return opt.split() if " " in opt else split_sentential(opt, nonterminals)
+        return cls.from_text(text, tokenizer=split_alternative)
+
+    def key(self):
+        """Hashable identity of the grammar, for caching derived tables."""
+        return (self.start, tuple(self.productions),
+                tuple(sorted(self.precedence.items())), tuple(sorted(self.rule_precedence.items())))
+
+    def is_nonterminal(self, sym):
+        return sym in self.prods_of
+
+    def production_str(self, p):
+        lhs, rhs = self.productions[p]
+        return f"{lhs} → {' '.join(rhs) if rhs else 'ε'}"
+
+    def production_precedence(self, p):
+        """`(level, assoc)` of production p: its %prec symbol, else its last terminal with a declared precedence."""
+        sym = self.rule_precedence.get(p)
+        if sym is None:
+            sym = next((s for s in reversed(self.productions[p][1]) if s in self.precedence and not self.is_nonterminal(s)), None)
+        return self.precedence.get(sym)
+
+    def to_text(self):
+        lines = []
+        for level in sorted({lvl for lvl, _ in self.precedence.values()}):
+            syms = [sym for sym, (lvl, _) in self.precedence.items() if lvl == level]
+            assoc = self.precedence[syms[0]][1]
+            lines.append(f"%{assoc} " + " ".join(f"'{sym}'" for sym in syms))
+        for nt in self.nonterminals:
+            alts = []
+            for p in self.prods_of[nt]:
+                alt = " ".join(self.productions[p][1]) or "ε"
+                if p in self.rule_precedence:
+                    alt += f" %prec {self.rule_precedence[p]}"
+                alts.append(alt)
+            lines.append(f"{nt} -> {' | '.join(alts)}")
+        return "\n".join(lines)
+
+    # --- FIRST / FOLLOW ---
+
+    def nullable(self):
+        if self._nullable is None:
+            nullable = set()
+            changed = True
+            while changed:
+                changed = False
+                for lhs, rhs in self.productions:
+                    if lhs not in nullable and all(s in nullable for s in rhs):
+                        nullable.add(lhs)
+                        changed = True
+            self._nullable = nullable
+        return self._nullable
+
+    def first_sets(self):
+        """FIRST of every non-terminal (terminals only; use `nullable()` for ε)."""
+        if self._first is None:
+            nullable = self.nullable()
+            first = {nt: set() for nt in self.nonterminals}
+            changed = True
+            while changed:
+                changed = False
+                for lhs, rhs in self.productions:
+                    before = len(first[lhs])
+                    for sym in rhs:
+                        if sym in first:
+                            first[lhs] |= first[sym]
+                            if sym not in nullable:
+                                break
+                        else:
+                            first[lhs].add(sym)
+                            break
+                    if len(first[lhs]) != before:
+                        changed = True
+            self._first = first
+        return self._first
+
+    def first_of(self, seq):
+        """Returns (FIRST(seq), seq derives ε)."""
+        first, nullable = self.first_sets(), self.nullable()
+        res = set()
+        for sym in seq:
+            if sym in first:
+                res |= first[sym]
+                if sym not in nullable:
+                    return res, False
+            else:
+                res.add(sym)
+                return res, False
+        return res, True
+
+    def follow_sets(self):
+        if self._follow is None:
+            follow = {nt: set() for nt in self.nonterminals}
+            if self.start is not None:
+                follow[self.start].add(END_MARKER)
+            changed = True
+            while changed:
+                changed = False
+                for lhs, rhs in self.productions:
+                    for i, sym in enumerate(rhs):
+                        if sym not in follow:
+                            continue
+                        before = len(follow[sym])
+                        rest_first, rest_nullable = self.first_of(rhs[i + 1:])
+                        follow[sym] |= rest_first
+                        if rest_nullable:
+                            follow[sym] |= follow[lhs]
+                        if len(follow[sym]) != before:
+                            changed = True
+            self._follow = follow
+        return self._follow
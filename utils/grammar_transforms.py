@@ -0,0 +1,350 @@
+from collections import deque
+from itertools import product
+
+from utils.grammar import Grammar
+
+# Paull's algorithm gives up past this many productions and reports the blow-up
+MAX_PRODUCTIONS = 20000
+
+def fresh_name(name, taken):
+    """`name` primed until it is not in `taken`; the result is added to `taken`."""
+    while name in taken:
+        name += "'"
+    taken.add(name)
+    return name
+
+def _rebuild(grammar, kept, start=None):
+    # New grammar from (old index or None, lhs, rhs) triples, keeping precedence
+    # declarations. Bodies using a non-terminal left with no rules are dropped,
+    # so it is never mistaken for a terminal.
+    nts = set(grammar.nonterminals)
+    while True:
+        defined = {lhs for _, lhs, _ in kept}
+        trimmed = [k for k in kept if all(sym in defined or sym not in nts for sym in k[2])]
+        if len(trimmed) == len(kept):
+            break
+        kept = trimmed
+    rule_precedence = {}
+    for k, (p, _, _) in enumerate(kept):
+        if p is not None and p in grammar.rule_precedence:
+            rule_precedence[k] = grammar.rule_precedence[p]
+    return Grammar([(lhs, rhs) for _, lhs, rhs in kept], start=start or grammar.start,
+                   precedence=grammar.precedence, rule_precedence=rule_precedence)
+
+def productive_symbols(grammar):
+    """Non-terminals that derive some terminal string.
+
+    Each production counts its body's non-terminals not yet known to be
+    productive; when the count reaches zero its LHS joins the worklist.
+    Every body symbol is touched once, so this is linear in grammar size.
+    """
+    pending = []
+    uses = {}
+    work = deque()
+    productive = set()
+    for p, (lhs, rhs) in enumerate(grammar.productions):
+        nts = [sym for sym in rhs if grammar.is_nonterminal(sym)]
+        pending.append(len(nts))
+        for sym in nts:
+            uses.setdefault(sym, []).append(p)
+        if not nts and lhs not in productive:
+            productive.add(lhs)
+            work.append(lhs)
+    while work:
+        sym = work.popleft()
+        for p in uses.get(sym, ()):
+            pending[p] -= 1
+            lhs = grammar.productions[p][0]
+            if pending[p] == 0 and lhs not in productive:
+                productive.add(lhs)
+                work.append(lhs)
+    return productive
+
+def reachable_symbols(grammar):
+    """Non-terminals reachable from the start symbol, by worklist."""
+    if grammar.start is None or not grammar.is_nonterminal(grammar.start):
+        return set()
+    reachable = {grammar.start}
+    work = deque([grammar.start])
+    while work:
+        for p in grammar.prods_of[work.popleft()]:
+            for sym in grammar.productions[p][1]:
+                if grammar.is_nonterminal(sym) and sym not in reachable:
+                    reachable.add(sym)
+                    work.append(sym)
+    return reachable
+
+def remove_useless(grammar):
+    """Drop non-productive, then unreachable, productions; returns `(grammar, report)`."""
+    report = []
+    productive = productive_symbols(grammar)
+    kept = []
+    for p, (lhs, rhs) in enumerate(grammar.productions):
+        dead = lhs if lhs not in productive else next(
+            (sym for sym in rhs if grammar.is_nonterminal(sym) and sym not in productive), None)
+        if dead is None:
+            kept.append((p, lhs, rhs))
+        else:
+            report.append({"Step": "Non-productive", "Production": grammar.production_str(p),
+                           "Reason": f"{dead} derives no terminal string"})
+    grammar = _rebuild(grammar, kept)
+
+    reachable = reachable_symbols(grammar)
+    kept = []
+    for p, (lhs, rhs) in enumerate(grammar.productions):
+        if lhs in reachable:
+            kept.append((p, lhs, rhs))
+        else:
+            report.append({"Step": "Unreachable", "Production": grammar.production_str(p),
+                           "Reason": f"{lhs} is not reachable from {grammar.start}"})
+    return _rebuild(grammar, kept), report
+
+def remove_epsilon(grammar):
+    """Eliminate ε-productions; returns `(grammar, report)`.
+
+    Every body gets a variant for each way of leaving out its nullable
+    symbols. If the start symbol is nullable, a fresh start `S0 -> S | ε`
+    keeps ε in the language.
+    """
+    nullable = grammar.nullable()
+    report = []
+    kept = []
+    seen = set()
+    for p, (lhs, rhs) in enumerate(grammar.productions):
+        if not rhs:
+            report.append({"Step": "ε-production", "Production": grammar.production_str(p),
+                           "Reason": f"{lhs} is nullable; its uses get ε-free variants"})
+            continue
+        choices = [((sym,), ()) if sym in nullable else ((sym,),) for sym in rhs]
+        for parts in product(*choices):
+            body = tuple(sym for part in parts for sym in part)
+            if body and (lhs, body) not in seen:
+                seen.add((lhs, body))
+                kept.append((p if body == rhs else None, lhs, body))
+    start = grammar.start
+    if start in nullable:
+        start = fresh_name(f"{start}0", set(grammar.nonterminals) | set(grammar.terminals))
+        kept = [(None, start, (grammar.start,)), (None, start, ())] + kept
+        report.append({"Step": "ε-production", "Production": f"{start} → {grammar.start} | ε",
+                       "Reason": f"new start symbol, since {grammar.start} is nullable"})
+    return _rebuild(grammar, kept, start), report
+
+def remove_units(grammar):
+    """Replace unit productions `A -> B` by B's non-unit bodies; returns `(grammar, report)`."""
+    units = {}
+    report = []
+    for p, (lhs, rhs) in enumerate(grammar.productions):
+        if len(rhs) == 1 and grammar.is_nonterminal(rhs[0]):
+            units.setdefault(lhs, []).append(rhs[0])
+            report.append({"Step": "Unit production", "Production": grammar.production_str(p),
+                           "Reason": f"replaced by the non-unit bodies of {rhs[0]}"})
+    if not units:
+        return grammar, report
+    kept = []
+    seen = set()
+    for a in grammar.nonterminals:
+        reach, work = [a], deque([a])
+        in_reach = {a}
+        while work:
+            for b in units.get(work.popleft(), ()):
+                if b not in in_reach:
+                    in_reach.add(b)
+                    reach.append(b)
+                    work.append(b)
+        for b in reach:
+            for p in grammar.prods_of[b]:
+                rhs = grammar.productions[p][1]
+                if not (len(rhs) == 1 and grammar.is_nonterminal(rhs[0])) and (a, rhs) not in seen:
+                    seen.add((a, rhs))
+                    kept.append((p if a == b else None, a, rhs))
+    return _rebuild(grammar, kept), report
+
+def normalize(grammar, epsilon=False, unit=False):
+    """Normalization pipeline: optional ε- and unit-elimination, then useless-symbol removal.
+
+    Returns `(grammar, report)`; report rows are `{Step, Production,
+    Reason}` for every production removed or introduced.
+    """
+    report = []
+    if epsilon:
+        grammar, rows = remove_epsilon(grammar)
+        report += rows
+    if unit:
+        grammar, rows = remove_units(grammar)
+        report += rows
+    grammar, rows = remove_useless(grammar)
+    return grammar, report + rows
+
+def _left_corners(grammar, through_nullable):
+    # A -> {B: B can start a body of A}, optionally looking past nullable prefixes
+    nullable = grammar.nullable() if through_nullable else ()
+    corners = {nt: set() for nt in grammar.nonterminals}
+    for lhs, rhs in grammar.productions:
+        for sym in rhs:
+            if grammar.is_nonterminal(sym):
+                corners[lhs].add(sym)
+            if sym not in nullable:
+                break
+    return corners
+
+def _sccs(nodes, edges):
+    """Strongly connected components (iterative Tarjan), in reverse topological order."""
+    index, low, on_stack, stack, out = {}, {}, set(), [], []
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(edges.get(root, ())))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is None:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    comp = []
+                    while True:
+                        x = stack.pop()
+                        on_stack.discard(x)
+                        comp.append(x)
+                        if x == node:
+                            break
+                    out.append(comp)
+            elif child not in index:
+                index[child] = low[child] = len(index)
+                stack.append(child)
+                on_stack.add(child)
+                work.append((child, iter(edges.get(child, ()))))
+            elif child in on_stack:
+                low[node] = min(low[node], index[child])
+    return out
+
+def _left_recursive_groups(grammar, through_nullable=False):
+    corners = _left_corners(grammar, through_nullable)
+    return [comp for comp in _sccs(grammar.nonterminals, corners)
+            if len(comp) > 1 or comp[0] in corners[comp[0]]]
+
+def eliminate_left_recursion(grammar, max_productions=MAX_PRODUCTIONS):
+    """Remove direct and indirect left recursion with Paull's algorithm.
+
+    Substitution is confined to the strongly connected components of the
+    left-corner graph: a non-terminal outside every cycle is never
+    expanded. Within a component, non-terminals with fewer bodies come
+    first, since each one's bodies are copied into the ones after it.
+    Paull's algorithm needs an ε-free, cycle-free grammar, so a left-recursive
+    grammar with nullable symbols goes through `remove_epsilon` first, and
+    one with unit cycles through `remove_units`.
+
+    Returns `(grammar, report)`. Raises ValueError when the rewrite grows
+    past `max_productions` productions.
+    """
+    grammar, report = remove_useless(grammar)
+    if grammar.nullable() and _left_recursive_groups(grammar, through_nullable=True):
+        grammar, rows = remove_epsilon(grammar)
+        report += rows
+    unit_edges = {}
+    for lhs, rhs in grammar.productions:
+        if len(rhs) == 1 and grammar.is_nonterminal(rhs[0]):
+            unit_edges.setdefault(lhs, set()).add(rhs[0])
+    if any(len(comp) > 1 or comp[0] in unit_edges.get(comp[0], ()) for comp in _sccs(grammar.nonterminals, unit_edges)):
+        grammar, rows = remove_units(grammar)
+        report += rows
+
+    taken = set(grammar.nonterminals) | set(grammar.terminals)
+    bodies = {nt: dict.fromkeys(grammar.productions[p][1] for p in grammar.prods_of[nt]) for nt in grammar.nonterminals}
+    primed = {}
+    total = len(grammar.productions)
+
+    for comp in _left_recursive_groups(grammar):
+        order = sorted(comp, key=lambda nt: (len(bodies[nt]), grammar.nonterminals.index(nt)))
+        for i, a in enumerate(order):
+            for b in order[:i]:
+                expanded = {}
+                hits = 0
+                for body in bodies[a]:
+                    if body and body[0] == b:
+                        hits += 1
+                        for sub in bodies[b]:
+                            expanded[sub + body[1:]] = None
+                    else:
+                        expanded[body] = None
+                if hits:
+                    total += len(expanded) - len(bodies[a])
+                    bodies[a] = expanded
+                    report.append({"Step": "Substitution", "Production": f"{a} → {b} …",
+                                   "Reason": f"{hits} body(ies) of {a} start with {b}, replaced by its {len(bodies[b])} alternative(s)"})
+                if total > max_productions:
+                    raise ValueError(f"Left-recursion elimination passed {max_productions:,} productions "
+                                     f"while substituting {b} into {a}.")
+
+            alphas = [body[1:] for body in bodies[a] if body and body[0] == a]
+            if not alphas:
+                continue
+            betas = [body for body in bodies[a] if not body or body[0] != a]
+            new = primed[a] = fresh_name(f"{a}'", taken)
+            total -= len(bodies[a])
+            bodies[a] = dict.fromkeys(beta + (new,) for beta in betas)
+            bodies[new] = dict.fromkeys([alpha + (new,) for alpha in alphas if alpha] + [()])
+            total += len(bodies[a]) + len(bodies[new])
+            report.append({"Step": "Direct elimination", "Production": f"{a} → {a} α | β",
+                           "Reason": f"{len(alphas)} α and {len(betas)} β part(s); new non-terminal {new}"})
+
+    kept = []
+    for nt in grammar.nonterminals:
+        kept += [(None, nt, body) for body in bodies[nt]]
+        if nt in primed:
+            kept += [(None, primed[nt], body) for body in bodies[primed[nt]]]
+    result, rows = remove_useless(_rebuild(grammar, kept))
+    return result, report + rows
+
+def _prefix_trie(grammar, nt):
+    # Trie of nt's bodies; a node is [children, production ending here or None, bodies below]
+    root = [{}, None, 0]
+    for p in grammar.prods_of[nt]:
+        node = root
+        node[2] += 1
+        for sym in grammar.productions[p][1]:
+            node = node[0].setdefault(sym, [{}, None, 0])
+            node[2] += 1
+        if node[1] is None:
+            node[1] = p
+    return root
+
+def left_factor(grammar):
+    """Left-factor every non-terminal in one traversal of a trie of its alternatives.
+
+    A trie node with several children is a point where alternatives part
+    ways; the chain of single-child nodes above it is their common prefix
+    α. Each such node becomes a new non-terminal (A', A'', …) whose bodies
+    are its children, so the alternatives of every non-terminal, new or
+    old, start with distinct symbols and the result is already the
+    fixpoint of repeated factoring. Cost is linear in the grammar size.
+
+    Returns `(grammar, report)`.
+    """
+    taken = set(grammar.nonterminals) | set(grammar.terminals)
+    kept = []
+    report = []
+    for nt in grammar.nonterminals:
+        work = deque([(nt, _prefix_trie(grammar, nt))])
+        while work:
+            lhs, node = work.popleft()
+            if node[1] is not None:
+                kept.append((node[1] if lhs == nt else None, lhs, ()))
+            for sym, child in node[0].items():
+                prefix = [sym]
+                while len(child[0]) == 1 and child[1] is None:
+                    sym, child = next(iter(child[0].items()))
+                    prefix.append(sym)
+                if not child[0]:
+                    kept.append((child[1] if lhs == nt else None, lhs, tuple(prefix)))
+                    continue
+                new = fresh_name(f"{nt}'", taken)
+                kept.append((None, lhs, tuple(prefix) + (new,)))
+                work.append((new, child))
+                report.append({"Step": "Left factoring", "Production": f"{lhs} → {' '.join(prefix)} {new}",
+                               "Reason": f"{child[2]} alternatives of {lhs} share the prefix {' '.join(prefix)}"})
+    return _rebuild(grammar, kept), report
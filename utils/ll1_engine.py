@@ -0,0 +1,441 @@
+from array import array
+
+from utils.cache import BuildCache
+
+EPSILON_SYMBOLS = ("ε", "e")
+END_MARKER = "$"
+
+# Trace levels for `LL1Table.run`
+TRACE_FULL = "full"        # One row per step (teaching UI)
+TRACE_SAMPLED = "sampled"  # Every `sample_every`-th step plus the final row
+TRACE_NONE = "none"        # No rows at all (bulk parsing throughput)
+DEFAULT_SAMPLE_EVERY = 50
+
+# Compiled tables keyed by the grammar's productions, so repeated button
+# presses (and repeated simulations) reuse the same dense matrix.
+_TABLES = BuildCache()
+
+class LL1Table:
+    """Dense LL(1) predictive parsing table.
+
+    Terminals (including '$') are interned as IDs 0..n_terms-1 and the
+    non-terminals follow them, so the parse stack is a plain list of ints and
+    `sym >= n_terms` tells a non-terminal from a terminal. The table itself is
+    a flat `array('i')` of production indices (-1 = error) laid out row-major
+    by non-terminal.
+    """
+
+    def __init__(self, firsts, follows, nts, terms, rules):
+        body_symbols = set()
+        for lhs in nts:
+            for rhs in rules[lhs]:
+                body_symbols.update(self._body(rhs))
+
+        # Any RHS symbol that is not a non-terminal is a terminal, even if the
+        # FIRST/FOLLOW pass did not classify it as one.
+        extra_terms = body_symbols - set(nts) - set(terms)
+        self.terminals = sorted(set(terms) | extra_terms) + [END_MARKER]
+        self.nonterminals = list(nts)
+        self.n_terms = len(self.terminals)
+        self.terminal_ids = {t: i for i, t in enumerate(self.terminals)}
+        self.symbol_ids = dict(self.terminal_ids)
+        for j, nt in enumerate(self.nonterminals):
+            self.symbol_ids[nt] = self.n_terms + j
+        self.symbols = self.terminals + self.nonterminals
+        self.end_id = self.terminal_ids[END_MARKER]
+        self.start_id = self.n_terms if self.nonterminals else -1
+
+        self.productions = []  # (lhs, rhs) exactly as written, for display
+        self.pushes = []       # RHS symbol IDs, pre-reversed for stack pushes
+        self.table = array("i", [-1]) * (len(self.nonterminals) * self.n_terms)
+        self.conflicts = 0
+
+        # Per non-terminal bitset of the terminals in its FIRST set, i.e. the
+        # table entries that do not come from FOLLOW alone
+        self.first_bits = []
+        for lhs in self.nonterminals:
+            row = (self.symbol_ids[lhs] - self.n_terms) * self.n_terms
+            bits = 0
+            for rhs in rules[lhs]:
+                p = len(self.productions)
+                body = self._body(rhs)
+                self.productions.append((lhs, rhs))
+                self.pushes.append(tuple(self.symbol_ids[s] for s in reversed(body)))
+
+                alpha_first = self._first_of(body, firsts)
+                for a in alpha_first:
+                    if a != "ε":
+                        self._set(row, a, p)
+                        bits |= 1 << self.terminal_ids[a]
+                if "ε" in alpha_first:
+                    for b in follows[lhs]:
+                        self._set(row, b, p)
+            self.first_bits.append(bits)
+
+        # Panic-mode recovery: per non-terminal bitset of the terminals at
+        # which scanning stops, i.e. FOLLOW(A) ∪ {$} (the synchronizing set)
+        # plus every terminal with a table entry for A.
+        self.sync_bits = []
+        for lhs in self.nonterminals:
+            row = (self.symbol_ids[lhs] - self.n_terms) * self.n_terms
+            bits = 1 << self.end_id
+            for b in follows[lhs]:
+                bits |= 1 << self.terminal_ids[b]
+            for t in range(self.n_terms):
+                if self.table[row + t] >= 0:
+                    bits |= 1 << t
+            self.sync_bits.append(bits)
+
+        self.loop_bits = self._prediction_loops()
+
+    def _prediction_loops(self):
+        """Per non-terminal bitset of the lookaheads on which predicting it never consumes input.
+
+        On a fixed lookahead every prediction is forced, so the parser runs
+        into a loop exactly when it can reach the same non-terminal again
+        through leftmost symbols that pop without matching. That happens
+        with left recursion, and with conflicting tables where the last
+        production wins. Conflict-free LL(1) tables never loop.
+        """
+        n_terms, n_nts = self.n_terms, len(self.nonterminals)
+        table, pushes = self.table, self.pushes
+        loop_bits = [0] * n_nts
+        for t in range(n_terms):
+            prods = [table[j * n_terms + t] for j in range(n_nts)]
+            # Non-terminals that pop on lookahead t without matching anything
+            vanish = [False] * n_nts
+            changed = True
+            while changed:
+                changed = False
+                for j, p in enumerate(prods):
+                    if p >= 0 and not vanish[j] and all(s >= n_terms and vanish[s - n_terms] for s in pushes[p]):
+                        vanish[j] = changed = True
+            # succ[j]: non-terminals reaching the top of the stack after predicting j on t
+            succ = []
+            for p in prods:
+                nxt = []
+                for s in reversed(pushes[p]) if p >= 0 else ():
+                    if s < n_terms:
+                        break
+                    nxt.append(s - n_terms)
+                    if not vanish[s - n_terms]:
+                        break
+                succ.append(nxt)
+            # A non-terminal loops if it reaches a cycle of succ (iterative DFS)
+            loops = [None] * n_nts   # None: unvisited, "path": on the DFS path
+            for root in range(n_nts):
+                if loops[root] is not None:
+                    continue
+                loops[root] = "path"
+                work = [(root, iter(succ[root]))]
+                while work:
+                    node, children = work[-1]
+                    child = next(children, None)
+                    if child is None:
+                        work.pop()
+                        if loops[node] == "path":
+                            loops[node] = False
+                        if work and loops[node] is True:
+                            loops[work[-1][0]] = True
+                    elif loops[child] == "path" or loops[child] is True:
+                        loops[node] = True
+                    elif loops[child] is None:
+                        loops[child] = "path"
+                        work.append((child, iter(succ[child])))
+            for j in range(n_nts):
+                if loops[j] is True:
+                    loop_bits[j] |= 1 << t
+        return loop_bits
+
+    @staticmethod
+    def _body(rhs):
+        """RHS with epsilon markers dropped (an ε-production has an empty body)."""
+        return [s for s in rhs if s not in EPSILON_SYMBOLS]
+
+    @staticmethod
+    def _first_of(body, firsts):
+        res = set()
+        for sym in body:
+            if sym not in firsts:  # Terminal
+                res.add(sym)
+                return res
+            res.update(firsts[sym] - {"ε"})
+            if "ε" not in firsts[sym]:
+                return res
+        res.add("ε")
+        return res
+
+    def _set(self, row, terminal, p):
+        cell = row + self.terminal_ids[terminal]
+        if self.table[cell] not in (-1, p):
+            self.conflicts += 1
+        # Later productions win, matching the original dict-based table.
+        self.table[cell] = p
+
+    def lookup(self, nt_id, term_id):
+        """Production index for M[nt, term], or -1 for an error entry."""
+        return self.table[(nt_id - self.n_terms) * self.n_terms + term_id]
+
+    def encode(self, tokens):
+        """Map input tokens to terminal IDs (unknown tokens become -1) and append '$'."""
+        get = self.terminal_ids.get
+        return [get(t, -1) for t in tokens] + [self.end_id]
+
+    def production_str(self, p):
+        lhs, rhs = self.productions[p]
+        rhs_display = ["ε" if x in EPSILON_SYMBOLS else x for x in rhs] if rhs else ["ε"]
+        return f"{lhs} → {' '.join(rhs_display)}"
+
+    def _trace_row(self, stack, tokens, pos, action, step=None):
+        row = {
+            "Stack": " ".join(self.symbols[s] for s in reversed(stack)),
+            "Input": " ".join(tokens[pos:]),
+            "Action": action,
+        }
+        if step is not None:
+            row = {"Step": step, **row}
+        return row
+
+    def run(self, tokens, trace=TRACE_FULL, sample_every=DEFAULT_SAMPLE_EVERY):
+        """Drive the predictive parser over a token sequence.
+
+        Input is consumed by index, so a parse is linear in the number of
+        steps, and there is no step cap. Returns `(history, error)` where
+        `history` holds the trace rows requested by `trace` and `error` is
+        None on acceptance.
+        """
+        if self.start_id < 0:
+            return None, "Error: No grammar found."
+        history, errors = self._drive(tokens, trace, sample_every, recover=False)
+        return history, (errors[0]["Message"] if errors else None)
+
+    def parse_with_recovery(self, tokens, trace=TRACE_NONE, sample_every=DEFAULT_SAMPLE_EVERY):
+        """Parse in a single pass with panic-mode recovery.
+
+        Returns `(history, errors)` where `errors` lists every syntax error
+        found (empty on acceptance) as dicts with the token position, the
+        offending token, the message and the recovery action taken.
+        """
+        if self.start_id < 0:
+            return None, [{"Position": 0, "Token": END_MARKER, "Message": "Error: No grammar found.", "Recovery": "-"}]
+        return self._drive(tokens, trace, sample_every, recover=True)
+
+    def _drive(self, tokens, trace, sample_every, recover):
+        tokens = list(tokens)
+        ids = self.encode(tokens)
+        tokens.append(END_MARKER)
+        symbols, table, pushes, sync_bits = self.symbols, self.table, self.pushes, self.sync_bits
+        loop_bits = self.loop_bits
+        n_terms, end_id = self.n_terms, self.end_id
+        full = trace == TRACE_FULL
+        sampled = trace == TRACE_SAMPLED
+        record = full or sampled
+
+        stack = [end_id, self.start_id]
+        history = []
+        errors = []
+        pos = 0
+        step = 0
+
+        def log(action):
+            history.append(self._trace_row(stack, tokens, pos, action, step if sampled else None))
+
+        def report(message, recovery, at=None):
+            at = pos if at is None else at
+            if errors and errors[-1]["Position"] == at + 1:
+                # Same offending token: fold follow-up recovery into one report
+                errors[-1]["Recovery"] += f"; {recovery}"
+            else:
+                errors.append({"Position": at + 1, "Token": tokens[at], "Message": message, "Recovery": recovery})
+
+        # Recovery that consumes nothing is deterministic in (pos, stack), so a
+        # repeated configuration at one position means it would cycle forever
+        seen = set()
+        seen_at = -1
+
+        def stalled():
+            nonlocal seen_at
+            if seen_at != pos:
+                seen.clear()
+                seen_at = pos
+            key = tuple(stack)
+            if key in seen:
+                return True
+            seen.add(key)
+            return False
+
+        def break_loop(message):
+            nonlocal pos
+            if ids[pos] != end_id:
+                recovery = "Skipped 1 token(s) to break a recovery loop"
+                report(message, recovery)
+                pos += 1
+            else:
+                recovery = "Abandoned the rest of the stack to break a recovery loop"
+                report(message, recovery)
+                del stack[1:]
+            if record:
+                log(f"Error: {recovery}")
+
+        while True:
+            top = stack[-1]
+            a = ids[pos]
+            keep = full or (sampled and step % sample_every == 0)
+
+            if top < n_terms:
+                if top == a:
+                    if a == end_id:
+                        if record:
+                            log("Accept ✅" if not errors else f"Done ({len(errors)} error(s) recovered)")
+                        return history, errors
+                    if keep:
+                        log(f"Match! Pop '{symbols[top]}'")
+                    stack.pop()
+                    pos += 1
+                elif not recover:
+                    if record:
+                        log("Error: Terminal mismatch.")
+                    report(f"Mismatch Error: Expected '{symbols[top]}' but found '{tokens[pos]}'.", "-")
+                    return history, errors
+                elif top == end_id:
+                    # Stack is exhausted but input remains: drop the offending
+                    # token, skip to one in FIRST(start) and parse a new sentence
+                    # from there. Entries that only come from FOLLOW would predict
+                    # ε and restart forever without consuming anything.
+                    start = pos
+                    start_first = self.first_bits[self.start_id - n_terms]
+                    pos += 1
+                    a = ids[pos]
+                    while a != end_id and (a < 0 or not (start_first >> a) & 1):
+                        pos += 1
+                        a = ids[pos]
+                    recovery = f"Skipped {pos - start} token(s)"
+                    if a != end_id:
+                        recovery += f", restarted {symbols[self.start_id]}"
+                        stack.append(self.start_id)
+                    report(f"Syntax Error: Unexpected '{tokens[start]}' after a complete '{symbols[self.start_id]}'.",
+                           recovery, at=start)
+                    if record:
+                        log(f"Error: Extra input ({recovery})")
+                else:
+                    message = f"Mismatch Error: Expected '{symbols[top]}' but found '{tokens[pos]}'."
+                    if stalled():
+                        break_loop(message)
+                    else:
+                        # Pretend the expected terminal was there
+                        report(message, f"Inserted missing '{symbols[top]}'")
+                        if record:
+                            log(f"Error: Missing '{symbols[top]}' (pop)")
+                        stack.pop()
+            else:
+                p = table[(top - n_terms) * n_terms + a] if a >= 0 else -1
+                if p >= 0 and (loop_bits[top - n_terms] >> a) & 1:
+                    if record:
+                        log("Error: Prediction loop")
+                    report(self._loop_message(top, a), "-")
+                    return history, errors
+                if p >= 0:
+                    if keep:
+                        log(f"Predict: {self.production_str(p)}")
+                    stack.pop()
+                    stack.extend(pushes[p])
+                elif not recover:
+                    if record:
+                        log(f"Error: No rule for ({symbols[top]}, {tokens[pos]})")
+                    report(f"Runtime Error: Input '{tokens[pos]}' unexpected for '{symbols[top]}'.", "-")
+                    return history, errors
+                else:
+                    message = f"Runtime Error: Input '{tokens[pos]}' unexpected for '{symbols[top]}'."
+                    start = pos
+                    # Scan ahead to a token in FIRST or the synchronizing set ($ always stops it)
+                    bits = sync_bits[top - n_terms]
+                    while a < 0 or not (bits >> a) & 1:
+                        pos += 1
+                        a = ids[pos]
+                    skipped = pos - start
+                    if not skipped and stalled():
+                        break_loop(message)
+                    else:
+                        if table[(top - n_terms) * n_terms + a] >= 0:
+                            recovery = f"Skipped {skipped} token(s), resumed {symbols[top]}"
+                        else:
+                            recovery = (f"Skipped {skipped} token(s), " if skipped else "") + f"popped {symbols[top]}"
+                            stack.pop()
+                        report(message, recovery, at=start)
+                        if record:
+                            log(f"Error: {recovery}")
+            step += 1
+
+    def events(self, tokens):
+        """Stream SAX-style parse events for a token iterable.
+
+        Tokens are pulled one at a time, so memory stays proportional to the
+        nesting depth rather than the input size. Yields `(kind, symbol,
+        detail)` tuples where kind is one of 'enter', 'predict', 'match',
+        'exit', 'accept' or 'error'. Parsing stops after 'accept' or 'error'.
+        """
+        if self.start_id < 0:
+            yield ("error", None, "Error: No grammar found.")
+            return
+
+        symbols, table, pushes = self.symbols, self.table, self.pushes
+        n_terms, end_id = self.n_terms, self.end_id
+        get_id = self.terminal_ids.get
+        # Exit markers are negative: ~(X + count * n_syms) stands for `count`
+        # pending exits of X, so right-recursive list rules like E' -> + T E'
+        # bump a counter instead of growing the stack with every item.
+        n_syms = len(symbols)
+        loop_bits = self.loop_bits
+
+        token_iter = iter(tokens)
+        def advance():
+            tok = next(token_iter, END_MARKER)
+            return tok, (end_id if tok == END_MARKER else get_id(tok, -1))
+
+        tok, a = advance()
+        stack = [end_id, self.start_id]
+
+        while True:
+            top = stack.pop()
+            if top < 0:
+                count, nt = divmod(~top, n_syms)
+                if count > 1:
+                    stack.append(~(nt + (count - 1) * n_syms))
+                yield ("exit", symbols[nt], None)
+            elif top < n_terms:
+                if top != a:
+                    yield ("error", symbols[top], f"Mismatch Error: Expected '{symbols[top]}' but found '{tok}'.")
+                    return
+                if a == end_id:
+                    yield ("accept", None, None)
+                    return
+                yield ("match", tok, None)
+                tok, a = advance()
+            else:
+                p = table[(top - n_terms) * n_terms + a] if a >= 0 else -1
+                if p < 0:
+                    yield ("error", symbols[top], f"Runtime Error: Input '{tok}' unexpected for '{symbols[top]}'.")
+                    return
+                if (loop_bits[top - n_terms] >> a) & 1:
+                    yield ("error", symbols[top], self._loop_message(top, a))
+                    return
+                yield ("enter", symbols[top], None)
+                yield ("predict", symbols[top], self.production_str(p))
+                if stack[-1] < 0 and ~stack[-1] % n_syms == top:
+                    stack[-1] -= n_syms  # One more pending exit of the same symbol
+                else:
+                    stack.append(~(top + n_syms))
+                stack.extend(pushes[p])
+
+    def _loop_message(self, nt_id, term_id):
+        return (f"Grammar Error: '{self.symbols[nt_id]}' keeps expanding on '{self.symbols[term_id]}' "
+                f"without consuming input (left recursion or a conflicting table).")
+
+    def recognize(self, tokens):
+        """Returns True if the token list is accepted (no trace is recorded)."""
+        return self.run(tokens, trace=TRACE_NONE)[1] is None
+
+def compile_ll1_table(firsts, follows, nts, terms, rules):
+    """Return the compiled `LL1Table` for a grammar, building it only once."""
+    key = tuple((nt, tuple(tuple(rhs) for rhs in rules[nt])) for nt in nts)
+    return _TABLES.get(key, lambda: LL1Table(firsts, follows, nts, terms, rules))
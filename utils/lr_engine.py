@@ -0,0 +1,574 @@
+from collections import deque
+
+from utils.cache import BuildCache
+from utils.grammar import Grammar, END_MARKER
+
+SHIFT = "shift"
+REDUCE = "reduce"
+ACCEPT = "accept"
+
+# Built tables keyed by (method, grammar), so each grammar is compiled once
+_TABLES = BuildCache()
+
+def augment(grammar):
+    """Return a copy of `grammar` with a fresh start production S' -> S as production 0."""
+    new_start = grammar.start + "'"
+    while grammar.is_nonterminal(new_start) or new_start in grammar.terminals:
+        new_start += "'"
+    return Grammar([(new_start, (grammar.start,))] + grammar.productions, start=new_start,
+                   precedence=grammar.precedence,
+                   rule_precedence={p + 1: sym for p, sym in grammar.rule_precedence.items()})
+
+class LR0Automaton:
+    """Canonical collection of LR(0) item sets for an augmented grammar.
+
+    An item is a single int: `item_base[p] + dot`, so a state's kernel is a
+    sorted tuple of ints and is interned through `state_of`.
+    """
+
+    def __init__(self, grammar):
+        self._init_items(grammar)
+
+        self.kernels = [(self.item_base[0],)]
+        self.state_of = {self.kernels[0]: 0}
+        self.closures = []
+        self.transitions = []
+        i = 0
+        while i < len(self.kernels):
+            items = self.closure(self.kernels[i])
+            self.closures.append(items)
+            groups = {}
+            for it in items:
+                x = self.item_next[it]
+                if x is not None:
+                    groups.setdefault(x, []).append(it + 1)
+            trans = {}
+            for x, advanced in groups.items():
+                kernel = tuple(sorted(advanced))
+                j = self.state_of.get(kernel)
+                if j is None:
+                    j = len(self.kernels)
+                    self.kernels.append(kernel)
+                    self.state_of[kernel] = j
+                trans[x] = j
+            self.transitions.append(trans)
+            i += 1
+
+    def _init_items(self, grammar):
+        self.grammar = grammar
+        self.item_base = []
+        self.item_prod = []
+        self.item_dot = []
+        self.item_next = []  # Symbol after the dot, None for complete items
+        for p, (lhs, rhs) in enumerate(grammar.productions):
+            self.item_base.append(len(self.item_prod))
+            for dot in range(len(rhs) + 1):
+                self.item_prod.append(p)
+                self.item_dot.append(dot)
+                self.item_next.append(rhs[dot] if dot < len(rhs) else None)
+
+        # Non-kernel items contributed by a non-terminal after the dot,
+        # i.e. the initial items of everything it can start with.
+        self.nt_closure = {}
+        for nt in grammar.nonterminals:
+            seen = {nt}
+            todo = [nt]
+            items = []
+            while todo:
+                x = todo.pop()
+                for p in grammar.prods_of[x]:
+                    it = self.item_base[p]
+                    items.append(it)
+                    y = self.item_next[it]
+                    if y is not None and grammar.is_nonterminal(y) and y not in seen:
+                        seen.add(y)
+                        todo.append(y)
+            self.nt_closure[nt] = tuple(sorted(items))
+
+    def closure(self, kernel):
+        items = list(kernel)
+        seen_items = set(kernel)
+        seen_nts = set()
+        for it in kernel:
+            x = self.item_next[it]
+            if x in self.nt_closure and x not in seen_nts:
+                seen_nts.add(x)
+                for extra in self.nt_closure[x]:
+                    if extra not in seen_items:
+                        seen_items.add(extra)
+                        items.append(extra)
+        return tuple(items)
+
+    def is_complete(self, it):
+        return self.item_next[it] is None
+
+    def item_str(self, it):
+        lhs, rhs = self.grammar.productions[self.item_prod[it]]
+        dot = self.item_dot[it]
+        return f"{lhs} → {' '.join(rhs[:dot] + ('•',) + rhs[dot:])}"
+
+    def state_str(self, s):
+        return "\n".join(self.item_str(it) for it in self.closures[s])
+
+class LR1Automaton(LR0Automaton):
+    """LR(1) item sets with Pager-style merging of same-core states.
+
+    A kernel is its LR(0) core (sorted item ints) plus one lookahead bitset
+    per item. A new kernel is merged into an existing state with the same
+    core when the two are weakly compatible (Pager), which cannot introduce
+    conflicts, so the automaton keeps full LR(1) power with a state count
+    close to LALR(1). With `merge=False` only identical kernels are shared,
+    giving the textbook canonical LR(1) collection.
+    """
+
+    def __init__(self, grammar, merge=True):
+        self._init_items(grammar)
+        self.merge = merge
+        self.terms = grammar.terminals + [END_MARKER]
+        self.term_id = {t: i for i, t in enumerate(self.terms)}
+
+        # FIRST bits of what follows the symbol after the dot, and whether it is nullable
+        first_bits = {nt: self._term_bits(fs) for nt, fs in grammar.first_sets().items()}
+        nullable = grammar.nullable()
+        self.first_after = []
+        for it, p in enumerate(self.item_prod):
+            rhs = grammar.productions[p][1]
+            bits, rest_nullable = 0, True
+            for x in rhs[self.item_dot[it] + 1:]:
+                if grammar.is_nonterminal(x):
+                    bits |= first_bits[x]
+                    if x not in nullable:
+                        rest_nullable = False
+                        break
+                else:
+                    bits |= 1 << self.term_id[x]
+                    rest_nullable = False
+                    break
+            self.first_after.append((bits, rest_nullable))
+
+        self.kernels = [(self.item_base[0],)]
+        self.kernel_las = [[1 << self.term_id[END_MARKER]]]
+        self.states_by_core = {self.kernels[0]: [0]}
+        self.transitions = [{}]
+        queue = deque([0])
+        queued = {0}
+        while queue:
+            s = queue.popleft()
+            queued.discard(s)
+            order, la = self.closure1(s)
+            groups = {}
+            for it in order:
+                x = self.item_next[it]
+                if x is not None:
+                    adv = groups.setdefault(x, {})
+                    adv[it + 1] = adv.get(it + 1, 0) | la[it]
+            trans = self.transitions[s]
+            for x, adv in groups.items():
+                core = tuple(sorted(adv))
+                las = [adv[it] for it in core]
+                t = trans.get(x)
+                if t is None:
+                    n_states = len(self.kernels)
+                    t = self._find_state(core, las)
+                    trans[x] = t
+                    if t == n_states:
+                        # A new state is explored at least once, whatever its lookaheads
+                        self.kernel_las[t] = list(las)
+                        queued.add(t)
+                        queue.append(t)
+                        continue
+                # Propagate lookaheads into an existing successor (re-explore it if they grew)
+                if self._absorb(t, las) and t not in queued:
+                    queued.add(t)
+                    queue.append(t)
+
+        self.closures = []
+        self.closure_las = []
+        for s in range(len(self.kernels)):
+            order, la = self.closure1(s)
+            self.closures.append(tuple(order))
+            self.closure_las.append(la)
+
+    def _term_bits(self, terms):
+        bits = 0
+        for t in terms:
+            bits |= 1 << self.term_id[t]
+        return bits
+
+    def _find_state(self, core, las):
+        for c in self.states_by_core.get(core, ()):
+            if self.kernel_las[c] == las or (self.merge and _weakly_compatible(self.kernel_las[c], las)):
+                return c
+        s = len(self.kernels)
+        self.kernels.append(core)
+        self.kernel_las.append([0] * len(core))
+        self.states_by_core.setdefault(core, []).append(s)
+        self.transitions.append({})
+        return s
+
+    def _absorb(self, s, las):
+        current = self.kernel_las[s]
+        grew = False
+        for i, bits in enumerate(las):
+            if current[i] | bits != current[i]:
+                current[i] |= bits
+                grew = True
+        return grew
+
+    def closure1(self, s):
+        """LR(1) closure of state `s`: (items in discovery order, {item: lookahead bits})."""
+        la = dict(zip(self.kernels[s], self.kernel_las[s]))
+        order = list(self.kernels[s])
+        work = list(order)
+        while work:
+            it = work.pop()
+            x = self.item_next[it]
+            if x is None or x not in self.nt_closure:
+                continue
+            fbits, rest_nullable = self.first_after[it]
+            bits = fbits | la[it] if rest_nullable else fbits
+            for p in self.grammar.prods_of[x]:
+                j = self.item_base[p]
+                old = la.get(j)
+                if old is None:
+                    la[j] = bits
+                    order.append(j)
+                    work.append(j)
+                elif old | bits != old:
+                    la[j] = old | bits
+                    work.append(j)
+        return order, la
+
+    def lookaheads(self, s, it):
+        return _bits_to_terms(self.closure_las[s][it], self.terms)
+
+    def state_str(self, s):
+        return "\n".join(f"{self.item_str(it)}, {'/'.join(sorted(self.lookaheads(s, it)))}" for it in self.closures[s])
+
+def _weakly_compatible(a, b):
+    """Pager's weak compatibility of two lookahead vectors over the same core."""
+    n = len(a)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if (a[i] & b[j]) or (b[i] & a[j]):
+                if not (a[i] & a[j]) and not (b[i] & b[j]):
+                    return False
+    return True
+
+class LRTable:
+    """ACTION/GOTO tables plus a linear-time shift-reduce driver.
+
+    `transitions[s]` maps every symbol to the successor state and
+    `reductions[s]` lists `(production, lookaheads)` pairs for the complete
+    items of state `s`. Shift/reduce conflicts covered by the grammar's
+    precedence declarations are settled as in yacc and listed in
+    `resolved`; the losing action is dropped from `all_actions` too, so a
+    GLR parse honours them. Remaining conflicts are resolved the default
+    yacc way (shift beats reduce, and the earlier production wins a
+    reduce/reduce). They are recorded in `conflicts`.
+    """
+
+    def __init__(self, grammar, transitions, reductions, method, automaton=None):
+        self.grammar = grammar
+        self.method = method
+        self.automaton = automaton
+        self.n_states = len(transitions)
+        self.goto = [{x: j for x, j in trans.items() if grammar.is_nonterminal(x)} for trans in transitions]
+        self.all_actions = []
+        self.action = []
+        self.conflicts = []
+        self.resolved = []
+
+        for s, trans in enumerate(transitions):
+            cell = {}
+            for x, j in trans.items():
+                if not grammar.is_nonterminal(x):
+                    cell[x] = [(SHIFT, j)]
+            for p, lookaheads in sorted(reductions[s]):
+                act = (ACCEPT, p) if p == 0 else (REDUCE, p)
+                for a in lookaheads:
+                    acts = cell.setdefault(a, [])
+                    if act not in acts:
+                        acts.append(act)
+            self.all_actions.append(cell)
+            row = {}
+            for a, acts in list(cell.items()):
+                act = self._resolve(s, a, acts)
+                if act is None:
+                    del cell[a]
+                else:
+                    row[a] = act
+            self.action.append(row)
+
+    def _by_precedence(self, a, p):
+        """Settle shift `a` against reduce p from the declarations; None if undeclared.
+
+        Returns `(kind, reason)` where kind is SHIFT, REDUCE or None for a
+        %nonassoc error entry.
+        """
+        tok_prec = self.grammar.precedence.get(a)
+        rule_prec = self.grammar.production_precedence(p)
+        if tok_prec is None or rule_prec is None:
+            return None
+        if tok_prec[0] != rule_prec[0]:
+            if tok_prec[0] > rule_prec[0]:
+                return SHIFT, f"'{a}' binds tighter than the rule"
+            return REDUCE, f"the rule binds tighter than '{a}'"
+        assoc = tok_prec[1]
+        return {"left": REDUCE, "right": SHIFT}.get(assoc), f"'{a}' is %{assoc}"
+
+    def _resolve(self, s, a, acts):
+        if len(acts) == 1:
+            return acts[0]
+        shifts = [act for act in acts if act[0] == SHIFT]
+        reduces = [act for act in acts if act[0] == REDUCE]
+        if shifts and len(reduces) == 1 and len(acts) == 2:
+            decided = self._by_precedence(a, reduces[0][1])
+            if decided is not None:
+                kind, reason = decided
+                chosen = shifts[0] if kind == SHIFT else reduces[0] if kind == REDUCE else None
+                acts[:] = [chosen] if chosen else []
+                self.resolved.append({
+                    "State": s,
+                    "Symbol": a,
+                    "Actions": " | ".join(self.action_str(act) for act in shifts + reduces),
+                    "Chosen": self.action_str(chosen) if chosen else "error",
+                    "Reason": reason,
+                })
+                return chosen
+        kind = "shift/reduce" if shifts else "reduce/reduce"
+        chosen = shifts[0] if shifts else min(acts, key=lambda act: act[1])
+        self.conflicts.append({
+            "State": s,
+            "Symbol": a,
+            "Type": kind,
+            "Actions": " | ".join(self.action_str(act) for act in acts),
+            "Chosen": self.action_str(chosen),
+        })
+        return chosen
+
+    def action_str(self, act, verbose=True):
+        kind, arg = act
+        if kind == SHIFT:
+            return f"s{arg}"
+        if kind == ACCEPT:
+            return "acc"
+        return f"r{arg} ({self.grammar.production_str(arg)})" if verbose else f"r{arg}"
+
+    def table_rows(self):
+        """ACTION/GOTO table as display rows (conflicting cells list every action)."""
+        terms = self.grammar.terminals + [END_MARKER]
+        rows = []
+        for s in range(self.n_states):
+            row = {"State": s}
+            for t in terms:
+                acts = self.all_actions[s].get(t, [])
+                row[t] = " / ".join(self.action_str(act, verbose=False) for act in acts)
+            for nt in self.grammar.nonterminals[1:]:
+                row[nt] = self.goto[s].get(nt, "")
+            rows.append(row)
+        return rows
+
+    def parse(self, tokens, trace=True):
+        """Shift-reduce parse of a token list in time linear in the input.
+
+        Returns `(history, error)`; history rows use the Stack/Input/Action
+        format of the shift-reduce lab (empty when `trace` is False).
+        """
+        prods = self.grammar.productions
+        toks = list(tokens) + [END_MARKER]
+        states = [0]
+        symbols = [END_MARKER]
+        history = []
+        pos = 0
+
+        def log(action):
+            if trace:
+                history.append({"Stack": " ".join(symbols), "Input": " ".join(toks[pos:]), "Action": action})
+
+        while True:
+            a = toks[pos]
+            act = self.action[states[-1]].get(a)
+            if act is None:
+                log("Error")
+                expected = ", ".join(sorted(self.action[states[-1]]))
+                return history, f"Syntax Error: Unexpected '{a}' (expected one of: {expected})."
+            kind, arg = act
+            if kind == SHIFT:
+                log(f"Shift {a}")
+                states.append(arg)
+                symbols.append(a)
+                pos += 1
+            elif kind == REDUCE:
+                lhs, rhs = prods[arg]
+                log(f"Reduce: Handle = {' '.join(rhs) if rhs else 'ε'} --> {lhs}")
+                if rhs:
+                    del states[-len(rhs):]
+                    del symbols[-len(rhs):]
+                states.append(self.goto[states[-1]][lhs])
+                symbols.append(lhs)
+            else:
+                log("Accept")
+                return history, None
+
+    def recognize(self, tokens):
+        return self.parse(tokens, trace=False)[1] is None
+
+def build_slr_table(grammar):
+    """SLR(1): reduce on FOLLOW(lhs) in every state holding a complete LR(0) item."""
+    g = augment(grammar)
+    automaton = LR0Automaton(g)
+    follow = g.follow_sets()
+    reductions = []
+    for items in automaton.closures:
+        reductions.append([(automaton.item_prod[it], follow[g.productions[automaton.item_prod[it]][0]])
+                           for it in items if automaton.is_complete(it)])
+    return LRTable(g, automaton.transitions, reductions, "SLR(1)", automaton)
+
+def _bits_to_terms(bits, terms):
+    out = set()
+    while bits:
+        low = bits & -bits
+        out.add(terms[low.bit_length() - 1])
+        bits ^= low
+    return out
+
+def _digraph(edges, base):
+    """DeRemer–Pennello digraph: F(x) = base(x) ∪ ⋃ F(y) for x R y, with SCCs sharing one set.
+
+    Iterative (no recursion limit issues on big grammars); sets are int bitsets.
+    """
+    n = len(base)
+    done = n + 1
+    F = list(base)
+    N = [0] * n
+    stack = []
+    for root in range(n):
+        if N[root]:
+            continue
+        stack.append(root)
+        N[root] = len(stack)
+        work = [(root, 0, len(stack))]
+        while work:
+            x, i, depth = work[-1]
+            if i < len(edges[x]):
+                work[-1] = (x, i + 1, depth)
+                y = edges[x][i]
+                if N[y] == 0:
+                    stack.append(y)
+                    N[y] = len(stack)
+                    work.append((y, 0, len(stack)))
+                    continue
+                N[x] = min(N[x], N[y])
+                F[x] |= F[y]
+                continue
+            work.pop()
+            if N[x] == depth:
+                while True:
+                    top = stack.pop()
+                    N[top] = done
+                    F[top] = F[x]
+                    if top == x:
+                        break
+            if work:
+                parent = work[-1][0]
+                N[parent] = min(N[parent], N[x])
+                F[parent] |= F[x]
+    return F
+
+def build_lalr_table(grammar):
+    """LALR(1) lookaheads by DeRemer–Pennello relations over the LR(0) automaton.
+
+    Instead of building LR(1) item sets and merging them, lookaheads are
+    computed on non-terminal transitions (p, A):
+    Read = digraph(DR, reads), Follow = digraph(Read, includes), and
+    LA(q, A → ω) is the union of Follow over its lookback transitions.
+    """
+    g = augment(grammar)
+    automaton = LR0Automaton(g)
+    terms = g.terminals + [END_MARKER]
+    term_id = {t: i for i, t in enumerate(terms)}
+    nullable = g.nullable()
+    transitions = automaton.transitions
+
+    # Number the non-terminal transitions (p, A)
+    nt_trans = []
+    trans_index = {}
+    for p, trans in enumerate(transitions):
+        for x, q in trans.items():
+            if g.is_nonterminal(x):
+                trans_index[(p, x)] = len(nt_trans)
+                nt_trans.append((p, x, q))
+
+    # DR and reads
+    dr = []
+    reads = []
+    for p, a_nt, r in nt_trans:
+        bits = 0
+        rel = []
+        for x in transitions[r]:
+            if g.is_nonterminal(x):
+                if x in nullable:
+                    rel.append(trans_index[(r, x)])
+            else:
+                bits |= 1 << term_id[x]
+        if p == 0 and a_nt == g.productions[0][1][0]:
+            bits |= 1 << term_id[END_MARKER]  # S' -> S • $
+        dr.append(bits)
+        reads.append(rel)
+
+    # includes and lookback, found by walking every production from each (p', B)
+    includes = [[] for _ in nt_trans]
+    lookback = {}
+    suffix_nullable = []
+    for _, rhs in g.productions:
+        flags = [True] * (len(rhs) + 1)
+        for i in range(len(rhs) - 1, -1, -1):
+            flags[i] = flags[i + 1] and rhs[i] in nullable
+        suffix_nullable.append(flags)
+    for j, (p0, b_nt, _) in enumerate(nt_trans):
+        for prod in g.prods_of[b_nt]:
+            rhs = g.productions[prod][1]
+            state = p0
+            for i, x in enumerate(rhs):
+                if g.is_nonterminal(x) and suffix_nullable[prod][i + 1]:
+                    includes[trans_index[(state, x)]].append(j)
+                state = transitions[state][x]
+            lookback.setdefault((state, prod), []).append(j)
+
+    read_sets = _digraph(reads, dr)
+    follow_sets = _digraph(includes, read_sets)
+
+    reductions = []
+    for q, items in enumerate(automaton.closures):
+        reds = []
+        for it in items:
+            if automaton.is_complete(it):
+                prod = automaton.item_prod[it]
+                bits = 1 << term_id[END_MARKER] if prod == 0 else 0
+                for j in lookback.get((q, prod), ()):
+                    bits |= follow_sets[j]
+                reds.append((prod, _bits_to_terms(bits, terms)))
+        reductions.append(reds)
+    return LRTable(g, transitions, reductions, "LALR(1)", automaton)
+
+def build_lr1_table(grammar, merge=True):
+    """LR(1) table; with `merge` same-core states are merged on the fly when weakly compatible (Pager)."""
+    g = augment(grammar)
+    automaton = LR1Automaton(g, merge=merge)
+    reductions = []
+    for s, items in enumerate(automaton.closures):
+        reductions.append([(automaton.item_prod[it], automaton.lookaheads(s, it))
+                           for it in items if automaton.is_complete(it)])
+    return LRTable(g, automaton.transitions, reductions, "LR(1)" if merge else "Canonical LR(1)", automaton)
+
+BUILDERS = {
+    "SLR(1)": build_slr_table,
+    "LALR(1)": build_lalr_table,
+    "LR(1)": build_lr1_table,
+    "Canonical LR(1)": lambda grammar: build_lr1_table(grammar, merge=False),
+}
+
+def get_lr_table(grammar, method="SLR(1)"):
+    """Return the cached LR table of the given method for `grammar`."""
+    return _TABLES.get((method, grammar.key()), lambda: BUILDERS[method](grammar))
@@ -0,0 +1,257 @@
+from utils.cache import BuildCache
+from utils.grammar import END_MARKER
+
+YIELDS = "⋖"
+EQUAL = "≐"
+TAKES = "⋗"
+
+# Operator-precedence parsers built so far, keyed by grammar
+_PARSERS = BuildCache()
+
+def check_operator_grammar(grammar):
+    """Return a reason string if `grammar` is not an operator grammar, else None."""
+    for p, (lhs, rhs) in enumerate(grammar.productions):
+        if not rhs:
+            return f"{grammar.production_str(p)} is an ε-production."
+        for x, y in zip(rhs, rhs[1:]):
+            if grammar.is_nonterminal(x) and grammar.is_nonterminal(y):
+                return f"{grammar.production_str(p)} has adjacent non-terminals {x} {y}."
+    return None
+
+def leading_trailing(grammar):
+    """LEADING and TRAILING sets of every non-terminal.
+
+    LEADING(A) holds the terminals that can start a form A derives, possibly
+    after one non-terminal; TRAILING(A) is the mirror image.
+    """
+    leading = {nt: set() for nt in grammar.nonterminals}
+    trailing = {nt: set() for nt in grammar.nonterminals}
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in grammar.productions:
+            for sets, body in ((leading, rhs), (trailing, rhs[::-1])):
+                if not body:
+                    continue
+                before = len(sets[lhs])
+                if grammar.is_nonterminal(body[0]):
+                    sets[lhs] |= sets[body[0]]
+                    if len(body) > 1 and not grammar.is_nonterminal(body[1]):
+                        sets[lhs].add(body[1])
+                else:
+                    sets[lhs].add(body[0])
+                if len(sets[lhs]) != before:
+                    changed = True
+    return leading, trailing
+
+class OperatorPrecedenceParser:
+    """Operator-precedence relations, f/g functions and a single-stack parser.
+
+    Relations come from LEADING/TRAILING. An ambiguous operator grammar
+    gives some pair both ⋖ and ⋗. The grammar's %left/%right/%nonassoc
+    declarations, overridden by `precedence` (terminal -> `(level, assoc)`),
+    settle such pairs the way yacc would. Undeclared operators count as
+    `%left` below every declared one, in order of first appearance. Every
+    clash is recorded in `conflicts`.
+    """
+
+    def __init__(self, grammar, precedence=None):
+        self.grammar = grammar
+        self.terminals = list(grammar.terminals) + [END_MARKER]
+        self.leading, self.trailing = leading_trailing(grammar)
+        declared = dict(grammar.precedence)
+        declared.update(precedence or {})
+        offset = len(grammar.terminals)
+        self.precedence = {t: (k + 1 - offset, "left") for k, t in enumerate(grammar.terminals)}
+        self.precedence.update(declared)
+        self.relations = {}
+        self.conflicts = []
+
+        candidates = {}
+        def relate(a, b, rel):
+            candidates.setdefault((a, b), set()).add(rel)
+
+        for _, rhs in grammar.productions:
+            for i, x in enumerate(rhs):
+                nt = grammar.is_nonterminal(x)
+                if i + 1 < len(rhs):
+                    y = rhs[i + 1]
+                    if not nt and not grammar.is_nonterminal(y):
+                        relate(x, y, EQUAL)
+                    elif not nt:
+                        for b in self.leading[y]:
+                            relate(x, b, YIELDS)
+                    elif not grammar.is_nonterminal(y):
+                        for a in self.trailing[x]:
+                            relate(a, y, TAKES)
+                if not nt and i + 2 < len(rhs) and grammar.is_nonterminal(rhs[i + 1]) and not grammar.is_nonterminal(rhs[i + 2]):
+                    relate(x, rhs[i + 2], EQUAL)
+        if grammar.start is not None:
+            for b in self.leading[grammar.start]:
+                relate(END_MARKER, b, YIELDS)
+            for a in self.trailing[grammar.start]:
+                relate(a, END_MARKER, TAKES)
+
+        for (a, b), rels in candidates.items():
+            self.relations[(a, b)] = self._resolve(a, b, rels)
+        self.f, self.g = self._precedence_functions()
+
+    def _resolve(self, a, b, rels):
+        if len(rels) == 1:
+            return next(iter(rels))
+        if rels == {YIELDS, TAKES} and a in self.precedence and b in self.precedence:
+            (la, assoc), (lb, _) = self.precedence[a], self.precedence[b]
+            if la != lb:
+                chosen = TAKES if la > lb else YIELDS
+            else:
+                chosen = {"left": TAKES, "right": YIELDS}.get(assoc)
+        else:
+            chosen = None
+        self.conflicts.append({
+            "Left": a,
+            "Right": b,
+            "Relations": " / ".join(sorted(rels)),
+            "Chosen": chosen or "error",
+        })
+        return chosen
+
+    def _precedence_functions(self):
+        """Compress the relations into f/g integer functions, or (None, None) on a cycle.
+
+        f(a) and g(b) are longest-path lengths in the graph with f_a -> g_b for
+        a ⋗ b and g_b -> f_a for a ⋖ b, where a ≐ b merges f_a with g_b.
+        """
+        parent = {}
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        for (a, b), rel in self.relations.items():
+            if rel == EQUAL:
+                parent[find(("f", a))] = find(("g", b))
+        edges = {}
+        for (a, b), rel in self.relations.items():
+            if rel == TAKES:
+                edges.setdefault(find(("f", a)), set()).add(find(("g", b)))
+            elif rel == YIELDS:
+                edges.setdefault(find(("g", b)), set()).add(find(("f", a)))
+
+        longest = {}
+        for root in {find((side, t)) for side in "fg" for t in self.terminals}:
+            if root in longest:
+                continue
+            stack = [(root, iter(edges.get(root, ())))]
+            active = {root}
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    active.discard(node)
+                    longest[node] = max((longest[c] + 1 for c in edges.get(node, ())), default=0)
+                elif child in active:
+                    return None, None
+                elif child not in longest:
+                    active.add(child)
+                    stack.append((child, iter(edges.get(child, ()))))
+        f = {t: longest[find(("f", t))] for t in self.terminals}
+        g = {t: longest[find(("g", t))] for t in self.terminals}
+        return f, g
+
+    def relation(self, a, b, use_functions=False):
+        if use_functions and self.f is not None:
+            fa, gb = self.f.get(a), self.g.get(b)
+            if fa is None or gb is None:
+                return None
+            return YIELDS if fa < gb else TAKES if fa > gb else EQUAL
+        return self.relations.get((a, b))
+
+    def table_rows(self):
+        rows = []
+        for a in self.terminals:
+            row = {"": a}
+            for b in self.terminals:
+                row[b] = self.relations.get((a, b)) or ""
+            rows.append(row)
+        return rows
+
+    def function_rows(self):
+        if self.f is None:
+            return []
+        return [{"Terminal": t, "f": self.f[t], "g": self.g[t]} for t in self.terminals]
+
+    def _reduce_to(self, handle):
+        # Production whose RHS has the handle's terminals, with any non-terminal in the other slots
+        g = self.grammar
+        for lhs, rhs in g.productions:
+            if len(rhs) == len(handle) and all(
+                    g.is_nonterminal(x) == g.is_nonterminal(y) and (g.is_nonterminal(x) or x == y)
+                    for x, y in zip(rhs, handle)):
+                return lhs, rhs
+        return None
+
+    def parse(self, tokens, trace=True, use_functions=False):
+        """Single-stack operator-precedence parse; returns `(history, error)`.
+
+        Each step compares the topmost terminal on the stack with the next
+        input token. History rows use the Stack/Input/Action format of the
+        shift-reduce lab, plus the relation that decided the move.
+        """
+        g = self.grammar
+        toks = list(tokens) + [END_MARKER]
+        stack = [END_MARKER]
+        terms = [0]   # stack positions of terminals
+        history = []
+        pos = 0
+
+        def log(rel, action):
+            if trace:
+                history.append({"Stack": " ".join(stack), "Input": " ".join(toks[pos:]), "Relation": rel, "Action": action})
+
+        while True:
+            a, b = stack[terms[-1]], toks[pos]
+            if a == END_MARKER and b == END_MARKER:
+                # Non-terminal names are not tracked, so any lone non-terminal is accepted
+                if len(stack) == 2 and g.is_nonterminal(stack[1]):
+                    log("", "Accept")
+                    return history, None
+                log("", "Error")
+                return history, "Syntax Error: Input ended before a complete expression."
+            rel = self.relation(a, b, use_functions)
+            if rel in (YIELDS, EQUAL) and b == END_MARKER:
+                # Precedence functions fill blank cells, so this is where they catch errors
+                rel = None
+            if rel in (YIELDS, EQUAL):
+                log(f"{a} {rel} {b}", f"Shift {b}")
+                terms.append(len(stack))
+                stack.append(b)
+                pos += 1
+            elif rel == TAKES:
+                # Pop terminals until the one below yields to the last popped terminal
+                while True:
+                    top = stack[terms.pop()]
+                    if len(terms) == 1 or self.relation(stack[terms[-1]], top, use_functions) == YIELDS:
+                        break
+                start = terms[-1] + 1
+                handle = stack[start:]
+                match = self._reduce_to(handle)
+                if match is None:
+                    log(f"{a} {rel} {b}", "Error")
+                    return history, f"Syntax Error: No production matches handle '{' '.join(handle)}'."
+                lhs, rhs = match
+                log(f"{a} {rel} {b}", f"Reduce: Handle = {' '.join(handle)} --> {lhs}")
+                del stack[start:]
+                stack.append(lhs)
+            else:
+                log(f"{a} ? {b}", "Error")
+                return history, f"Syntax Error: No precedence relation between '{a}' and '{b}'."
+
+    def recognize(self, tokens):
+        return self.parse(tokens, trace=False)[1] is None
+
+def get_op_precedence_parser(grammar, precedence=None):
+    """Return the cached operator-precedence parser for `grammar`."""
+    key = (grammar.key(), tuple(sorted((precedence or {}).items())))
+    return _PARSERS.get(key, lambda: OperatorPrecedenceParser(grammar, precedence))
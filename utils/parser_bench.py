@@ -0,0 +1,41 @@
+import time
+
+def time_parser(recognize, corpus, repeat=3):
+    """Best-of-`repeat` wall time (seconds) to run `recognize` over every token list in `corpus`."""
+    best = float("inf")
+    accepted = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        accepted = sum(1 for tokens in corpus if recognize(tokens))
+        best = min(best, time.perf_counter() - t0)
+    return best, accepted
+
+def benchmark_parsers(parsers, corpora, repeat=3):
+    """Run every parser over every corpus and return one result row per pair.
+
+    `parsers` maps a display name to a `recognize(tokens) -> bool` callable
+    and `corpora` maps a corpus name to a list of token lists, so all
+    engines are measured against exactly the same inputs. A parser that
+    raises RecursionError gets a row with a Note instead of timings.
+    """
+    rows = []
+    for corpus_name, corpus in corpora.items():
+        n_tokens = sum(len(tokens) for tokens in corpus)
+        for parser_name, recognize in parsers.items():
+            try:
+                elapsed, accepted = time_parser(recognize, corpus, repeat)
+            except RecursionError as e:
+                # Too deeply nested for a recursive parser: not a reject
+                rows.append({"Corpus": corpus_name, "Parser": parser_name, "Inputs": len(corpus), "Tokens": n_tokens,
+                             "Accepted": None, "Time (ms)": None, "Tokens/sec": None, "Note": str(e)})
+                continue
+            rows.append({
+                "Corpus": corpus_name,
+                "Parser": parser_name,
+                "Inputs": len(corpus),
+                "Tokens": n_tokens,
+                "Accepted": accepted,
+                "Time (ms)": round(elapsed * 1000, 3),
+                "Tokens/sec": int(n_tokens / elapsed) if elapsed > 0 else None,
+            })
+    return rows
@@ -0,0 +1,131 @@
+import hashlib
+import re
+import types
+
+from utils.cache import BuildCache
+from utils.ll1_engine import END_MARKER
+
+# Loaded parser modules keyed by a hash of their generated source
+_MODULES = BuildCache()
+
+def _func_name(j, nt):
+    safe = re.sub(r"\W", "_", nt.replace("'", "_prime"))
+    return f"parse_{j}_{safe}"
+
+def generate_rd_source(table):
+    """Emit a standalone recursive-descent parser module from a compiled `LL1Table`.
+
+    There is one function per non-terminal. Each takes `(toks, pos)` and
+    returns the new position, dispatching on the lookahead through a
+    precomputed `{terminal: alternative}` dict. An alternative ending in the
+    function's own non-terminal (E' -> + T E') becomes a loop, so long lists
+    do not deepen the Python call stack.
+
+    Lookaheads on which the table's predictions would loop without
+    consuming input (`LL1Table.loop_bits`) dispatch to -1 and raise a
+    grammar error, so neither the tail loop nor the recursion can spin.
+    Input nested deeper than Python's recursion limit raises
+    `NestingError`, a `RecursionError`, which `recognize` lets through
+    rather than reporting a reject.
+    """
+    n_terms = table.n_terms
+    names = {nt: _func_name(j, nt) for j, nt in enumerate(table.nonterminals)}
+
+    out = [
+        "# Generated recursive-descent parser. Do not edit by hand.",
+        "",
+        "class ParseError(Exception):",
+        "    pass",
+        "",
+        "class NestingError(RecursionError):",
+        "    pass",
+        "",
+        "def _fail(nt, toks, pos):",
+        "    raise ParseError(f\"Runtime Error: Input '{toks[pos]}' unexpected for '{nt}'.\")",
+        "",
+        "def _expected(t, toks, pos):",
+        "    raise ParseError(f\"Mismatch Error: Expected '{t}' but found '{toks[pos]}'.\")",
+        "",
+        "def _loop(nt, toks, pos):",
+        "    raise ParseError(f\"Grammar Error: '{nt}' keeps expanding on '{toks[pos]}' without consuming input.\")",
+        "",
+    ]
+
+    for nt in table.nonterminals:
+        nt_id = table.symbol_ids[nt]
+        row = (nt_id - n_terms) * n_terms
+        # Alternatives of this non-terminal, numbered in grammar order
+        alts = [p for p, (lhs, _) in enumerate(table.productions) if lhs == nt]
+        alt_of = {p: k for k, p in enumerate(alts)}
+        loops = table.loop_bits[nt_id - n_terms]
+        predict = {table.terminals[t]: -1 if (loops >> t) & 1 else alt_of[table.table[row + t]]
+                   for t in range(n_terms) if table.table[row + t] >= 0}
+        dispatch = f"_PREDICT_{names[nt]}"
+        out.append(f"{dispatch} = {predict!r}")
+        out.append("")
+        out.append(f"def {names[nt]}(toks, pos):")
+        out.append(f"    # {nt}")
+        out.append("    while True:")
+        out.append(f"        alt = {dispatch}.get(toks[pos])")
+        out.append("        if alt is None:")
+        out.append(f"            _fail({nt!r}, toks, pos)")
+        if loops:
+            out.append("        if alt < 0:")
+            out.append(f"            _loop({nt!r}, toks, pos)")
+        for k, p in enumerate(alts):
+            body = [table.symbols[s] for s in reversed(table.pushes[p])]
+            out.append(f"        if alt == {k}:  # {table.production_str(p)}")
+            tail_loop = bool(body) and body[-1] == nt
+            for i, sym in enumerate(body[:-1] if tail_loop else body):
+                if sym in names:
+                    out.append(f"            pos = {names[sym]}(toks, pos)")
+                elif i == 0:
+                    # The dispatch dict already matched a leading terminal
+                    out.append("            pos += 1")
+                else:
+                    out.append(f"            if toks[pos] != {sym!r}:")
+                    out.append(f"                _expected({sym!r}, toks, pos)")
+                    out.append("            pos += 1")
+            out.append("            continue" if tail_loop else "            return pos")
+        out.append("")
+
+    start = names[table.nonterminals[0]] if table.nonterminals else None
+    out += [
+        "def parse(tokens):",
+        "    \"\"\"Parse a token sequence; raises ParseError on invalid input.\"\"\"",
+        f"    toks = list(tokens) + [{END_MARKER!r}]",
+    ]
+    if start:
+        out += [
+            "    try:",
+            f"        pos = {start}(toks, 0)",
+            "    except RecursionError:",
+            "        raise NestingError(\"Input is nested too deeply for the recursive-descent parser.\") from None",
+            f"    if toks[pos] != {END_MARKER!r}:",
+            f"        _expected({END_MARKER!r}, toks, pos)",
+            "    return True",
+        ]
+    else:
+        out.append("    raise ParseError(\"Error: No grammar found.\")")
+    out += [
+        "",
+        "def recognize(tokens):",
+        "    try:",
+        "        return parse(tokens)",
+        "    except ParseError:",
+        "        return False",
+        "",
+    ]
+    return "\n".join(out)
+
+def load_rd_parser(table):
+    """Generate, exec and cache the recursive-descent module for `table`."""
+    source = generate_rd_source(table)
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def build():
+        module = types.ModuleType(f"rd_parser_{key[:12]}")
+        module.__source__ = source
+        exec(compile(source, f"<rd_parser_{key[:12]}>", "exec"), module.__dict__)
+        return module
+    return _MODULES.get(key, build)
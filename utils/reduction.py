@@ -0,0 +1,117 @@
+import heapq
+
+from utils.grammar import END_MARKER
+from utils.lr_engine import get_lr_table
+from utils.search import SearchStore, ROOT
+
+# Weights of the remaining-work estimate: every input token still has to be
+# shifted and every stacked symbol beyond the first reduced away. Weights
+# above 1 trade optimality for heading straight through (weighted A*).
+INPUT_WEIGHT = 2
+STACK_WEIGHT = 1
+DEFAULT_MAX_STATES = 2000
+
+class ReductionSearch:
+    """Best-first search for a reduction sequence, pruned to viable prefixes.
+
+    A search state is an input position plus a parse stack. The stack is a
+    path in the LR(0) automaton: pushing a symbol with no transition would
+    leave the viable prefixes, so that move is never generated. A reduction
+    is tried only for a complete item of the top state whose lookahead is in
+    FOLLOW of its left side. Stacks are hash-consed into ints, so
+    duplicate (position, stack) states cost one dict lookup.
+
+    States come off a heap ordered by reductions so far plus a weighted
+    count of remaining tokens and stacked symbols. Where the LR(0) automaton
+    is deterministic the search is a plain LR parse; it branches only on
+    conflicts.
+    """
+
+    def __init__(self, grammar):
+        table = get_lr_table(grammar, "SLR(1)")
+        self.grammar = table.grammar
+        self.automaton = automaton = table.automaton
+        follow = self.grammar.follow_sets()
+        # reducible[s] -> [(production, FOLLOW of its lhs)] for complete items of state s
+        self.reducible = []
+        for items in automaton.closures:
+            self.reducible.append([(automaton.item_prod[it], follow[self.grammar.productions[automaton.item_prod[it]][0]])
+                                   for it in items if automaton.is_complete(it) and automaton.item_prod[it] != 0])
+        self.accept_state = automaton.transitions[0].get(grammar.start)
+
+    def solve(self, tokens, max_states=DEFAULT_MAX_STATES):
+        """Reduce `tokens` to the start symbol.
+
+        Returns `(form, (lhs, rhs))` pairs, one per reduction, where `form`
+        is the sentential form the reduction applies to, followed by
+        `(final form, None)`. Returns None if no sequence is found within
+        `max_states` stored states.
+        """
+        tokens = list(tokens)
+        n = len(tokens)
+        transitions, prods = self.automaton.transitions, self.grammar.productions
+        # Hash-consed stacks: id -> (LR state, symbol, id below, height)
+        stacks = [(0, None, ROOT, 0)]
+        stack_ids = {}
+
+        def push(below, sym):
+            state = transitions[stacks[below][0]].get(sym)
+            if state is None:
+                return None
+            key = (state, below)
+            sid = stack_ids.get(key)
+            if sid is None:
+                sid = stack_ids[key] = len(stacks)
+                stacks.append((state, sym, below, stacks[below][3] + 1))
+            return sid
+
+        store = SearchStore()
+        seen = {(0, 0)}
+        root = store.add((0, 0, 0))
+        heap = [(INPUT_WEIGHT * n, 0, root)]
+        while heap and len(store) < max_states:
+            _, _, node = heapq.heappop(heap)
+            pos, sid, reductions = store.states[node]
+            top = stacks[sid][0]
+            if pos == n and top == self.accept_state and stacks[sid][2] == 0:
+                return self._steps(store, node, stacks, tokens)
+
+            moves = []
+            if pos < n:
+                child = push(sid, tokens[pos])
+                if child is not None:
+                    moves.append((pos + 1, child, reductions, None))
+            lookahead = tokens[pos] if pos < n else END_MARKER
+            for p, follow in self.reducible[top]:
+                if lookahead not in follow:
+                    continue
+                lhs, rhs = prods[p]
+                below = sid
+                for _ in rhs:
+                    below = stacks[below][2]
+                child = push(below, lhs)
+                if child is not None:
+                    moves.append((pos, child, reductions + 1, p))
+
+            for new_pos, child, new_reductions, p in moves:
+                if (new_pos, child) in seen:
+                    continue
+                seen.add((new_pos, child))
+                new_node = store.add((new_pos, child, new_reductions), node, p)
+                priority = new_reductions + INPUT_WEIGHT * (n - new_pos) + STACK_WEIGHT * stacks[child][3]
+                heapq.heappush(heap, (priority, -new_pos, new_node))
+        return None
+
+    def _steps(self, store, node, stacks, tokens):
+        prods = self.grammar.productions
+        steps = []
+        for (pos, sid, _), p in store.path(node):
+            if p is not None:
+                steps[-1] = (steps[-1][0], prods[p])
+            symbols = []
+            while sid:
+                symbols.append(stacks[sid][1])
+                sid = stacks[sid][2]
+            steps.append((symbols[::-1] + tokens[pos:], None))
+        # Keep the forms a reduction applies to, plus the final one
+        return [step for step in steps[:-1] if step[1] is not None] + [steps[-1]]
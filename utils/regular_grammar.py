@@ -0,0 +1,108 @@
+from utils.grammar_transforms import fresh_name
+
+RIGHT_LINEAR = "Right-linear"
+LEFT_LINEAR = "Left-linear"
+EPSILON = "ε"
+
+def classify_linear(grammar):
+    """Return `(kind, reason)` for a grammar in one pass over its productions.
+
+    `kind` is RIGHT_LINEAR when every body is a terminal string optionally
+    followed by one non-terminal (A -> w B | w), LEFT_LINEAR for the mirror
+    form (A -> B w | w), and None otherwise, with `reason` naming the
+    offending production. A grammar of both forms counts as right-linear.
+    """
+    not_right = not_left = None
+    for p, (lhs, rhs) in enumerate(grammar.productions):
+        nts = [i for i, sym in enumerate(rhs) if grammar.is_nonterminal(sym)]
+        if len(nts) > 1:
+            return None, f"{grammar.production_str(p)} has {len(nts)} non-terminals in its body."
+        if nts and nts[0] != len(rhs) - 1 and not_right is None:
+            not_right = p
+        if nts and nts[0] != 0 and not_left is None:
+            not_left = p
+    if not_right is None:
+        return RIGHT_LINEAR, None
+    if not_left is None:
+        return LEFT_LINEAR, None
+    return None, (f"{grammar.production_str(not_right)} is not right-linear and "
+                  f"{grammar.production_str(not_left)} is not left-linear.")
+
+def grammar_to_nfa(grammar):
+    """Convert a right- or left-linear grammar to an NFA in `NFAEngine` format.
+
+    Returns `{'start', 'end', 'edges': [{'from', 'to', 'label'}], 'labels'}`
+    with int states; `labels` names the state of each non-terminal. For a
+    right-linear grammar every non-terminal is a state, A -> w B is a path
+    reading w from A to B, and A -> w a path from A to the final state. A
+    left-linear grammar is read in reverse: A -> B w runs from B to A, A -> w
+    from a fresh start state to A, and the start symbol accepts. Raises
+    ValueError if the grammar is not linear.
+    """
+    kind, reason = classify_linear(grammar)
+    if kind is None:
+        raise ValueError(reason)
+    state = {nt: k + 1 for k, nt in enumerate(grammar.nonterminals)}
+    labels = {k: nt for nt, k in state.items()}
+    edges = []
+    counter = [len(state)]
+
+    def new_state():
+        counter[0] += 1
+        return counter[0]
+
+    def path(src, word, dst):
+        for sym in word[:-1]:
+            mid = new_state()
+            edges.append({"from": src, "to": mid, "label": sym})
+            src = mid
+        edges.append({"from": src, "to": dst, "label": word[-1] if word else EPSILON})
+
+    extra = new_state()
+    labels[extra] = fresh_name("F" if kind == RIGHT_LINEAR else "q0", set(state))
+    for lhs, rhs in grammar.productions:
+        tail = bool(rhs) and grammar.is_nonterminal(rhs[-1])
+        head = bool(rhs) and grammar.is_nonterminal(rhs[0])
+        if kind == RIGHT_LINEAR:
+            if tail:
+                path(state[lhs], rhs[:-1], state[rhs[-1]])
+            else:
+                path(state[lhs], rhs, extra)
+        elif head:
+            path(state[rhs[0]], rhs[1:], state[lhs])
+        else:
+            path(extra, rhs, state[lhs])
+
+    if kind == RIGHT_LINEAR:
+        return {"start": state[grammar.start], "end": extra, "edges": edges, "labels": labels}
+    return {"start": extra, "end": state[grammar.start], "edges": edges, "labels": labels}
+
+def nfa_accepts(nfa, tokens):
+    """Simulate `nfa` on `tokens` with a set of current states: O(len(tokens) × edges)."""
+    moves = {}
+    for e in nfa["edges"]:
+        moves.setdefault((e["from"], e["label"]), []).append(e["to"])
+
+    def closure(states):
+        stack = list(states)
+        while stack:
+            for nxt in moves.get((stack.pop(), EPSILON), ()):
+                if nxt not in states:
+                    states.add(nxt)
+                    stack.append(nxt)
+        return states
+
+    current = closure({nfa["start"]})
+    for tok in tokens:
+        current = closure({nxt for s in current for nxt in moves.get((s, tok), ())})
+        if not current:
+            return False
+    return nfa["end"] in current
+
+def to_lab_nfa(nfa):
+    """The NFA in the nodes/edges format of the NFA → DFA conversion lab."""
+    states = sorted({nfa["start"], nfa["end"]} | {e["from"] for e in nfa["edges"]} | {e["to"] for e in nfa["edges"]})
+    taken = set(nfa["labels"].values())
+    names = {s: nfa["labels"].get(s) or fresh_name(f"q{s}", taken) for s in states}
+    nodes = [{"id": s, "label": names[s], "isStart": s == nfa["start"], "isFinal": s == nfa["end"]} for s in states]
+    return {"nodes": nodes, "edges": [dict(e) for e in nfa["edges"]]}
@@ -0,0 +1,101 @@
+from array import array
+
+ROOT = -1
+
+class SearchStore:
+    """Search-tree nodes kept as flat parent/action arrays.
+
+    Breadth-first solvers used to carry `history + [step]` in every queue
+    entry, copying the whole path at each expansion. Here a node is an int:
+    `parent[node]` and `action[node]` are stored once, and `path()` walks
+    the parent chain only for the nodes that turn out to be solutions.
+    Actions are interned, so each node costs two array slots plus a
+    reference to its state.
+    """
+
+    def __init__(self):
+        self.parent = array("i")
+        self.action = array("i")
+        self.depth = array("i")
+        self.states = []
+        self.actions = []
+        self._action_ids = {}
+
+    def __len__(self):
+        return len(self.states)
+
+    def add(self, state, parent=ROOT, action=None):
+        """Record `state`, reached from node `parent` by `action`; returns its node id."""
+        if action is None:
+            action_id = ROOT
+        else:
+            action_id = self._action_ids.get(action)
+            if action_id is None:
+                action_id = self._action_ids[action] = len(self.actions)
+                self.actions.append(action)
+        self.parent.append(parent)
+        self.action.append(action_id)
+        self.depth.append(self.depth[parent] + 1 if parent != ROOT else 0)
+        self.states.append(state)
+        return len(self.states) - 1
+
+    def path(self, node):
+        """`(state, action)` pairs from the root to `node`; the root's action is None."""
+        steps = []
+        while node != ROOT:
+            a = self.action[node]
+            steps.append((self.states[node], self.actions[a] if a != ROOT else None))
+            node = self.parent[node]
+        steps.reverse()
+        return steps
+
+    def states_on_path(self, node):
+        return [state for state, _ in self.path(node)]
+
+def bidirectional_search(source, goal, forward, backward, max_states=200000):
+    """Shortest path from `source` to `goal`, searching from both ends at once.
+
+    `forward(state)` yields `(next_state, action)` moves and
+    `backward(state)` yields `(prev_state, action)` such that `action` takes
+    `prev_state` to `state`. Whole BFS levels are expanded on whichever
+    side has the smaller frontier, and the search stops at the first level
+    where the two visited sets meet, so the path found is a shortest one.
+    Returns `(state, action)` pairs from source to goal (the first action is
+    None), or None if the sides do not meet within `max_states`.
+    """
+    stores = (SearchStore(), SearchStore())
+    seen = ({source: stores[0].add(source)}, {goal: stores[1].add(goal)})
+    frontiers = ([seen[0][source]], [seen[1][goal]])
+    moves = (forward, backward)
+    meet = (seen[0][source], seen[1][source]) if source in seen[1] else None
+
+    while meet is None and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        store, own, other = stores[side], seen[side], seen[1 - side]
+        best = None
+        next_frontier = []
+        for node in frontiers[side]:
+            if len(stores[0]) + len(stores[1]) >= max_states:
+                return None
+            for state, action in moves[side](store.states[node]):
+                if state in own:
+                    continue
+                child = own[state] = store.add(state, node, action)
+                next_frontier.append(child)
+                if state in other:
+                    cost = store.depth[child] + stores[1 - side].depth[other[state]]
+                    if best is None or cost < best[0]:
+                        best = (cost, (child, other[state]) if side == 0 else (other[state], child))
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        if best is not None:
+            meet = best[1]
+
+    if meet is None:
+        return None
+    head = stores[0].path(meet[0])
+    # The goal side was searched backwards: its actions lead into the parent state
+    tail = stores[1].path(meet[1])
+    steps = list(head)
+    for k in range(len(tail) - 1, 0, -1):
+        steps.append((tail[k - 1][0], tail[k][1]))
+    return steps
@@ -0,0 +1,135 @@
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+from utils.grammar_transforms import normalize
+
+DEFAULT_MAX_LENGTH = 60
+# Sentences buffered per write when streaming a corpus to a file
+WRITE_CHUNK = 10000
+
+class SentenceGenerator:
+    """Uniform random sentences of a given length, by counting derivations.
+
+    The grammar is first made ε-free and unit-free (`normalize`), so every
+    symbol yields at least one token and the number of derivations of each
+    length is finite. `counts[A][n]` is that number for non-terminal A and
+    length n, and `suffix[p][i][n]` the number of ways the body of
+    production p from position i on yields n tokens, both as exact Python
+    ints up to `max_length`.
+
+    A sample picks each production, then each split of the length among
+    the body's symbols, with probability proportional to the derivations
+    it leaves, so every derivation of length n is equally likely (every
+    sentence, for an unambiguous grammar). The cumulative weights of each
+    choice are built the first time it comes up and searched by bisection.
+    """
+
+    def __init__(self, grammar, max_length=DEFAULT_MAX_LENGTH, seed=None):
+        self.grammar, self.report = normalize(grammar, epsilon=True, unit=True)
+        self.max_length = max_length
+        self.rng = random.Random(seed)
+        g = self.grammar
+        size = max_length + 1
+        self.counts = {sym: [0] * size for sym in g.nonterminals}
+        self._terminal = [0, 1] + [0] * (size - 2)
+        self.suffix = [[[0] * size for _ in range(len(rhs) + 1)] for _, rhs in g.productions]
+        for table in self.suffix:
+            table[-1][0] = 1
+
+        for n in range(size):
+            # A non-empty body yields n tokens only if its first symbol yields fewer,
+            # except a lone terminal; both need suffix sums below n only
+            for p, (lhs, rhs) in enumerate(g.productions):
+                if rhs:
+                    self.suffix[p][0][n] = self._ways(p, 0, n)
+                self.counts[lhs][n] += self.suffix[p][0][n]
+            for p, (_, rhs) in enumerate(g.productions):
+                for i in range(len(rhs) - 1, 0, -1):
+                    self.suffix[p][i][n] = self._ways(p, i, n)
+        self._choices = {}
+
+    def _ways(self, p, i, n):
+        # Derivations of body p from position i yielding n tokens
+        sym_counts = self.counts.get(self.grammar.productions[p][1][i], self._terminal)
+        rest = self.suffix[p][i + 1]
+        return sum(sym_counts[m] * rest[n - m] for m in range(1, n + 1) if sym_counts[m] and rest[n - m])
+
+    def count(self, length, symbol=None):
+        """Number of derivations of `length` tokens from `symbol` (default: the start symbol)."""
+        if length > self.max_length:
+            raise ValueError(f"Length {length} is above the generator's maximum of {self.max_length}.")
+        counts = self.counts.get(symbol or self.grammar.start)
+        return counts[length] if counts else 0
+
+    def lengths(self):
+        """Lengths up to `max_length` that have at least one sentence."""
+        return [n for n in range(self.max_length + 1) if self.count(n)]
+
+    def _table(self, key, options):
+        # Cumulative weights and picks of one choice, built from (weight, pick) pairs
+        pairs = [(w, c) for w, c in options if w]
+        table = self._choices[key] = (list(accumulate(w for w, _ in pairs)), [c for _, c in pairs])
+        return table
+
+    def sample(self, length):
+        """One uniformly random sentence (token list) of `length` tokens, or None if there is none."""
+        g = self.grammar
+        if not self.count(length):
+            return None
+        choices, randrange = self._choices, self.rng.randrange
+        prods, prods_of, suffix, counts = g.productions, g.prods_of, self.suffix, self.counts
+        tokens = []
+        work = [(g.start, length)]
+        while work:
+            sym, n = work.pop()
+            key = (sym, n)
+            bounds, picks = choices.get(key) or self._table(key, ((suffix[p][0][n], p) for p in prods_of[sym]))
+            p = picks[0] if len(picks) == 1 else picks[bisect_right(bounds, randrange(bounds[-1]))]
+            rhs = prods[p][1]
+            parts = []
+            for i in range(len(rhs) - 1):
+                x = rhs[i]
+                if x not in counts:
+                    # A terminal is always one token
+                    parts.append((x, 1))
+                    n -= 1
+                    continue
+                key = (p, i, n)
+                table = choices.get(key)
+                if table is None:
+                    rest = suffix[p][i + 1]
+                    table = self._table(key, ((counts[x][m] * rest[n - m], m) for m in range(1, n + 1)))
+                bounds, picks = table
+                m = picks[0] if len(picks) == 1 else picks[bisect_right(bounds, randrange(bounds[-1]))]
+                parts.append((x, m))
+                n -= m
+            if rhs:
+                parts.append((rhs[-1], n))
+            work.extend(reversed(parts))
+            # Terminals reaching the top of the stack are output in order
+            while work and work[-1][0] not in counts:
+                tokens.append(work.pop()[0])
+        return tokens
+
+    def sentences(self, length, n):
+        """Lazily yield `n` independent uniform sentences of `length` tokens."""
+        if not self.count(length):
+            return
+        for _ in range(n):
+            yield self.sample(length)
+
+    def write(self, path, length, n):
+        """Stream `n` sentences, one space-separated line each, to the file at `path`; returns lines written."""
+        written = 0
+        with open(path, "w", encoding="utf-8") as out:
+            chunk = []
+            for tokens in self.sentences(length, n):
+                chunk.append(" ".join(tokens) + "\n")
+                if len(chunk) >= WRITE_CHUNK:
+                    out.writelines(chunk)
+                    written += len(chunk)
+                    chunk = []
+            out.writelines(chunk)
+            written += len(chunk)
+        return written
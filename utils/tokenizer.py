@@ -0,0 +1,85 @@
+from utils.cache import BuildCache
+
+_END = ""
+
+# Tokenizers built so far, keyed by grammar and case folding
+_TOKENIZERS = BuildCache()
+
+def _fold(text):
+    # Lower-case per character, keeping characters whose lower form changes length
+    return "".join(low if len(low) == 1 else ch for ch, low in ((ch, ch.lower()) for ch in text))
+
+class SymbolTokenizer:
+    """Longest-match tokenizer compiled from grammar symbols into a character trie.
+
+    Text is read once, left to right: at each position the trie is walked
+    as far as the input allows and the longest symbol seen is emitted. With
+    `fold_case` the trie is keyed on lower-cased characters and a match is
+    mapped back to the grammar's own spelling (an exact spelling wins,
+    otherwise the first symbol with that folded form). Characters no symbol
+    covers are kept as tokens, not dropped: a run of letters/digits up to
+    the next symbol, or a single other character.
+    """
+
+    def __init__(self, symbols, fold_case=False):
+        self.fold_case = fold_case
+        self.symbols = set()
+        self.canonical = {}
+        self.trie = {}
+        for sym in symbols:
+            if not sym.strip() or sym in self.symbols:
+                continue
+            self.symbols.add(sym)
+            key = _fold(sym) if fold_case else sym
+            self.canonical.setdefault(key, sym)
+            node = self.trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_END] = key
+
+    def _longest(self, folded, i):
+        # End index of the longest symbol starting at i, or None
+        node, end = self.trie, None
+        for j in range(i, len(folded)):
+            node = node.get(folded[j])
+            if node is None:
+                break
+            if _END in node:
+                end = j + 1
+        return end
+
+    def tokenize(self, text):
+        """Split `text` into symbols by longest match; whitespace only separates tokens."""
+        folded = _fold(text) if self.fold_case else text
+        trie, symbols, canonical = self.trie, self.symbols, self.canonical
+        tokens = []
+        i, n = 0, len(text)
+        while i < n:
+            if text[i].isspace():
+                i += 1
+                continue
+            node, end, j = trie, None, i
+            while j < n:
+                node = node.get(folded[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    end, key = j, node[_END]
+            if end is not None:
+                token = text[i:end]
+                tokens.append(token if token in symbols else canonical[key])
+                i = end
+                continue
+            j = i + 1
+            if text[i].isalnum():
+                while j < n and text[j].isalnum() and self._longest(folded, j) is None:
+                    j += 1
+            tokens.append(text[i:j])
+            i = j
+        return tokens
+
+def get_tokenizer(grammar, fold_case=False):
+    """Return the cached tokenizer over `grammar`'s non-terminals and terminals."""
+    return _TOKENIZERS.get((grammar.key(), fold_case),
+                           lambda: SymbolTokenizer(grammar.nonterminals + grammar.terminals, fold_case))